@@ -0,0 +1,150 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from blogicum.db.routers import reads_from_replica
+
+from .models import Post
+
+PAGE_KEY_PREFIX = 'blog:page'
+# Бэкенды, у которых у каждого процесса свой экземпляр кеша.
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+GLOBAL_NAMESPACE = 'global'
+FEEDS_NAMESPACE = 'feeds'
+
+
+def post_namespace(post_id):
+    return f'post:{post_id}'
+
+
+def _version_key(namespace):
+    return f'{PAGE_KEY_PREFIX}:version:{namespace}'
+
+
+def _new_version():
+    # Если счётчик вытеснен из кеша, он не должен начаться заново с
+    # версии, под которой ещё лежат старые страницы.
+    return time.time_ns()
+
+
+def _bumped_key(namespace):
+    return f'{PAGE_KEY_PREFIX}:bumped:{namespace}'
+
+
+def get_versions(namespaces):
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*namespaces):
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+    if settings.DATABASE_REPLICA:
+        cache.set_many(
+            {_bumped_key(ns): time.time() for ns in namespaces},
+            settings.REPLICA_PIN_SECONDS,
+        )
+
+
+def may_be_stale(namespaces):
+    """Могли ли данные запроса отстать от недавнего изменения.
+
+    Реплика догоняет основную базу не сразу: собранное по ней сразу
+    после сброса версии осталось бы в кеше под новой версией до конца
+    срока жизни. Такие данные не кешируются.
+    """
+    if not reads_from_replica():
+        return False
+    return bool(cache.get_many(
+        [_bumped_key(namespace) for namespace in namespaces]
+    ))
+
+
+def uses_local_cache():
+    return settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS
+
+
+def get_page_cache_timeout():
+    """Время жизни страниц и счётчиков, сбрасываемых версиями.
+
+    Версии в локальном кеше процесса другие процессы не видят, поэтому
+    там срок ограничен LOCAL_PAGE_CACHE_TIMEOUT.
+    """
+    if uses_local_cache():
+        return min(
+            settings.PAGE_CACHE_TIMEOUT, settings.LOCAL_PAGE_CACHE_TIMEOUT
+        )
+    return settings.PAGE_CACHE_TIMEOUT
+
+
+def get_next_publication_timeout(timeout):
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    if next_pub_date is None:
+        return timeout
+    return min(timeout, math.ceil((next_pub_date - now).total_seconds()))
+
+
+def anonymous_page_cache(namespace, until_next_publication=True):
+    """Кеширует страницу целиком для анонимных пользователей.
+
+    `namespace` — строка или функция от аргументов представления. Ключ
+    включает версии общего пространства и `namespace`, которые сигналы
+    увеличивают при изменении данных. Для лент время жизни ограничено
+    ближайшей отложенной публикацией, чтобы пост появился вовремя.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view_func(request, *args, **kwargs)
+
+            name = namespace(**kwargs) if callable(namespace) else namespace
+            versions = get_versions((GLOBAL_NAMESPACE, name))
+            path_hash = hashlib.md5(
+                request.get_full_path().encode()
+            ).hexdigest()
+            key = '{}:{}:{}:{}:{}'.format(
+                PAGE_KEY_PREFIX, name, *versions, path_hash
+            )
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if (response.status_code != 200 or response.cookies
+                    or may_be_stale((GLOBAL_NAMESPACE, name))):
+                return response
+
+            def store(response):
+                timeout = get_page_cache_timeout()
+                if until_next_publication:
+                    timeout = get_next_publication_timeout(timeout)
+                if timeout > 0:
+                    cache.set(key, response, timeout)
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
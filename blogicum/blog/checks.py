@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cache import uses_local_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_page_cache(app_configs, **kwargs):
+    if not uses_local_cache():
+        return []
+    return [Warning(
+        'Кеш страниц сбрасывается версиями в LocMemCache, который у '
+        'каждого процесса свой: при нескольких процессах анонимы видят '
+        'устаревшие страницы до '
+        f'{settings.LOCAL_PAGE_CACHE_TIMEOUT} с.',
+        hint='Укажите в CACHES общий бэкенд: PyMemcacheCache, '
+        'DatabaseCache или Redis.',
+        id='blog.W001',
+    )]
@@ -0,0 +1,163 @@
+import re
+from pathlib import Path
+
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*(["\'])(.*?)\1', re.S)
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.S)
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+SELECTOR_CLASS_RE = re.compile(r'\.((?:[A-Za-z0-9_-]|\\.)+)')
+# Класс внутри :not() не обязателен для совпадения селектора.
+NOT_RE = re.compile(r':not\([^()]*\)')
+# Блоки, внутри которых лежат обычные правила и которые можно чистить.
+NESTED_AT_RULES = ('@media', '@supports')
+
+# Классы, которых нет в наших шаблонах, но которые выводит
+# django_bootstrap5 ({% bootstrap_form %}, {% bootstrap_button %},
+# пагинация и сообщения об ошибках).
+SAFELIST = frozenset({
+    'active', 'alert', 'alert-danger', 'alert-dismissible', 'btn',
+    'btn-close', 'btn-group', 'btn-primary', 'col-auto', 'col-form-label',
+    'disabled', 'fade', 'form-check', 'form-check-inline',
+    'form-check-input', 'form-check-label', 'form-control', 'form-floating',
+    'form-label', 'form-select', 'form-switch', 'form-text',
+    'has-validation', 'input-group', 'input-group-text', 'invalid-feedback',
+    'is-invalid', 'is-valid', 'list-unstyled', 'mb-3', 'mt-1', 'page-item',
+    'page-link', 'pagination', 'row', 'show', 'text-danger', 'valid-feedback',
+    'visually-hidden', 'was-validated',
+})
+
+
+def collect_classes(paths):
+    """Классы из атрибутов class="…" в шаблонах.
+
+    Теги шаблонизатора выбрасываются, а слова между ними остаются:
+    из `nav-link {% if … %} text-white {% endif %}` получится
+    {'nav-link', 'text-white'}.
+    """
+    classes = set()
+    for path in paths:
+        text = Path(path).read_text(encoding='utf-8')
+        for _, value in CLASS_ATTR_RE.findall(text):
+            classes.update(TEMPLATE_TAG_RE.sub(' ', value).split())
+    return classes
+
+
+def _find(css, chars, start):
+    """Позиция первого из `chars` вне строк и скобок, начиная со `start`."""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(css):
+        char = css[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif depth == 0 and char in chars:
+            return i
+        i += 1
+    return len(css)
+
+
+def _split_selectors(prelude):
+    selectors = []
+    start = 0
+    while start <= len(prelude):
+        end = _find(prelude, ',', start)
+        selectors.append(prelude[start:end].strip())
+        start = end + 1
+    return [selector for selector in selectors if selector]
+
+
+def parse(css):
+    """Разбирает CSS на список узлов верхнего уровня.
+
+    Узлы: ('rule', селектор, тело), ('block', @media/@supports, дети) и
+    ('raw', текст) — прочие @-правила, которые переносятся как есть.
+    """
+    nodes = []
+    i = 0
+    while i < len(css):
+        end = _find(css, '{;}', i)
+        prelude = css[i:end].strip()
+        if end >= len(css) or css[end] != '{':
+            if prelude:
+                nodes.append(('raw', prelude + ';'))
+            i = end + 1
+            continue
+        depth = 1
+        j = end + 1
+        while depth and j < len(css):
+            j = _find(css, '{}', j)
+            if j < len(css):
+                depth += 1 if css[j] == '{' else -1
+                j += 1
+        body = css[end + 1:j - 1]
+        if prelude.startswith(NESTED_AT_RULES):
+            nodes.append(('block', prelude, parse(body)))
+        elif prelude.startswith('@'):
+            nodes.append(('raw', f'{prelude}{{{body}}}'))
+        else:
+            nodes.append(('rule', prelude, body))
+        i = j
+    return nodes
+
+
+def selector_used(selector, classes):
+    return all(
+        name.replace('\\', '') in classes
+        for name in SELECTOR_CLASS_RE.findall(NOT_RE.sub('', selector))
+    )
+
+
+def purge(nodes, classes, keep_raw=True):
+    """Оставляет только правила, все классы селектора которых известны.
+
+    Селекторы без классов (`body`, `:root`, `[hidden]`) сохраняются.
+    """
+    result = []
+    for node in nodes:
+        if node[0] == 'rule':
+            selectors = [
+                selector for selector in _split_selectors(node[1])
+                if selector_used(selector, classes)
+            ]
+            if selectors:
+                result.append(('rule', ','.join(selectors), node[2]))
+        elif node[0] == 'block':
+            children = purge(node[2], classes, keep_raw)
+            if children:
+                result.append(('block', node[1], children))
+        elif keep_raw:
+            result.append(node)
+    return result
+
+
+def serialize(nodes):
+    parts = []
+    for node in nodes:
+        if node[0] == 'rule':
+            parts.append(f'{node[1]}{{{node[2]}}}')
+        elif node[0] == 'block':
+            parts.append(f'{node[1]}{{{serialize(node[2])}}}')
+        else:
+            parts.append(node[1])
+    return ''.join(parts)
+
+
+def build(css, classes, critical_classes):
+    """Возвращает (очищенный CSS, критический CSS для первого экрана).
+
+    В критический CSS попадают правила для классов первого экрана, без
+    @keyframes и прочих @-правил — они нужны уже после загрузки стилей.
+    """
+    nodes = parse(CSS_COMMENT_RE.sub('', css))
+    purged = serialize(purge(nodes, classes))
+    critical = serialize(purge(nodes, critical_classes, keep_raw=False))
+    return purged, critical
@@ -0,0 +1,231 @@
+import datetime
+import gzip
+import json
+from collections import defaultdict
+
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ('json', 'jsonl')
+
+
+class DumpJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder, сохраняющий микросекунды в датах."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def detect_format(path):
+    name = str(path)
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'json'
+
+
+def open_dump(path, mode='rt'):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    return opener(path, mode, encoding='utf-8')
+
+
+def _skip_separators(buffer, pos):
+    while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+        pos += 1
+    return pos
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Читает элементы JSON-массива по одному, не загружая файл целиком.
+
+    В памяти держится только текущий элемент и недочитанный хвост.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Ожидался JSON-массив.')
+    pos, eof = 1, False
+    while True:
+        pos = _skip_separators(buffer, pos)
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            if pos == len(buffer):
+                raise ValueError
+            item, pos = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                raise ValueError('JSON-массив оборван или повреждён.')
+            chunk = stream.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+        yield item
+
+
+def iter_json_lines(stream):
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise ValueError(f'Строка {number}: {error}')
+
+
+def iter_dump_lines(queryset, chunk_size):
+    """Сериализует записи в строки JSON Lines в формате dumpdata.
+
+    Записи читаются через iterator(), поэтому память не растёт с
+    размером таблицы.
+    """
+    serializer = python.Serializer()
+    for obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+        record, = serializer.serialize([obj])
+        yield json.dumps(
+            record, cls=DumpJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def iter_records(stream, fmt):
+    if fmt == 'jsonl':
+        return iter_json_lines(stream)
+    return iter_json_array(stream)
+
+
+def sort_models(models):
+    """Упорядочивает модели так, чтобы связанные шли раньше ссылающихся."""
+    models = set(models)
+    ordered = []
+
+    def visit(model, path):
+        if model in ordered or model in path:
+            return
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in models:
+                visit(field.related_model, path | {model})
+        ordered.append(model)
+
+    for model in sorted(models, key=lambda model: model._meta.label):
+        visit(model, frozenset())
+    return ordered
+
+
+def reset_sequences(models):
+    """Сдвигает последовательности ключей за явно вставленные значения."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class BulkLoader:
+    """Складывает объекты фикстуры в пакеты по моделям и вставляет их
+    одним INSERT на пакет.
+
+    Вставка идёт в «сыром» режиме, как у loaddata: значения полей с
+    auto_now и auto_now_add берутся из дампа (текущее время — только если
+    их там нет), сигналы не отправляются.
+    Полные пакеты пишутся сразу, остатки — в `finish()` в порядке
+    зависимостей. Ссылки проверяются в конце транзакции, поэтому порядок
+    записей в файле не важен.
+    """
+
+    def __init__(self, batch_size, ignore_conflicts=False,
+                 update_existing=False):
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.update_existing = update_existing
+        self.pending = defaultdict(list)
+        self.counts = defaultdict(int)
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        model = type(obj)
+        if obj.pk is None:
+            raise ValueError(
+                f'{model._meta.label}: у записи нет первичного ключа.'
+            )
+        self.add_object(obj)
+        for name, values in (deserialized.m2m_data or {}).items():
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            for value in values:
+                self._append(through, through(**{
+                    f'{source}_id': obj.pk, f'{target}_id': value,
+                }))
+
+    def add_object(self, obj):
+        """Ставит в очередь готовый объект модели с заданным ключом."""
+        model = type(obj)
+        for field in model._meta.concrete_fields:
+            # В старых дампах полей с auto_now может не быть.
+            auto = getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False
+            )
+            if auto and getattr(obj, field.attname) is None:
+                field.pre_save(obj, add=True)
+        self._append(model, obj)
+
+    def _append(self, model, obj):
+        batch = self.pending[model]
+        batch.append(obj)
+        if len(batch) >= self.batch_size:
+            self._flush(model)
+
+    def _flush(self, model):
+        objs = self.pending.pop(model, [])
+        if not objs:
+            return
+        fields = model._meta.concrete_fields
+        step = max(connection.ops.bulk_batch_size(fields, objs), 1)
+        for start in range(0, len(objs), step):
+            batch = objs[start:start + step]
+            if self.update_existing:
+                batch = self._update_existing(model, batch)
+            if batch:
+                model._base_manager._insert(
+                    batch, fields=fields, raw=True,
+                    ignore_conflicts=self.ignore_conflicts,
+                )
+        self.counts[model] += len(objs)
+
+    def _update_existing(self, model, objs):
+        """Обновляет уже существующие записи и возвращает новые."""
+        manager = model._base_manager
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objs]
+        ).values_list('pk', flat=True))
+        if existing:
+            manager.bulk_update(
+                [obj for obj in objs if obj.pk in existing],
+                [field.name for field in model._meta.concrete_fields
+                 if not field.primary_key],
+            )
+        return [obj for obj in objs if obj.pk not in existing]
+
+    def finish(self):
+        for model in sort_models(self.pending):
+            self._flush(model)
+        models = list(self.counts)
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in models]
+        )
+        reset_sequences(models)
+        return {model: self.counts[model] for model in sort_models(models)}
+
+
+def deserialize(records, exclude=()):
+    """Превращает записи дампа в объекты моделей, пропуская `exclude`."""
+    exclude = {label.lower() for label in exclude}
+    records = (
+        record for record in records
+        if record.get('model', '').lower() not in exclude
+        and record.get('model', '').lower().split('.')[0] not in exclude
+    )
+    return python.Deserializer(records, ignorenonexistent=True)
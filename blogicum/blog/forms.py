@@ -1,11 +1,27 @@
 from blog.models import Post, Comment
 from django import forms
+from django.core.exceptions import ValidationError
+
+
+class PostImageField(forms.ImageField):
+    """Показывает ошибку, найденную ещё при загрузке файла.
+
+    `PostImageUploadHandler` не дописывает слишком большие файлы, поэтому
+    открывать их в Pillow, как это делает ImageField, бессмысленно.
+    """
+
+    def to_python(self, data):
+        upload_error = getattr(data, 'upload_error', None)
+        if upload_error:
+            raise ValidationError(upload_error, code='upload_rejected')
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ['title', 'text', 'pub_date', 'location', 'category', 'image']
+        field_classes = {'image': PostImageField}
         widgets = {'pub_date': forms.DateTimeInput(
             attrs={
                 'type': 'datetime-local'
@@ -0,0 +1,312 @@
+import logging
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Модуль импортируется в процессах обработчика ещё до django.setup(),
+# поэтому модели здесь берутся через apps.get_model() внутри функций.
+
+try:
+    # Необязательный плагин: регистрирует в Pillow кодек AVIF.
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+# Форматы исходников, для которых делаются копии, и параметры
+# сохранения для них и для современных форматов из POST_IMAGE_FORMATS.
+SOURCE_FORMATS = ('JPEG', 'PNG', 'WEBP')
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 6},
+    'AVIF': {'quality': 60},
+}
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'AVIF': 'avif'}
+# Тег EXIF Orientation и значения, при которых ширина и высота меняются
+# местами.
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def get_output_formats(source_format):
+    Image.init()
+    modern = [
+        image_format.upper()
+        for image_format in settings.POST_IMAGE_FORMATS
+        if image_format.upper() in Image.SAVE
+    ]
+    # Формат исходника идёт последним: это запасной вариант для <img>.
+    return [f for f in modern if f != source_format] + [source_format]
+
+
+def get_mime_type(image_format):
+    return Image.MIME.get(image_format, f'image/{image_format.lower()}')
+
+
+def variant_name(name, width, image_format):
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.{EXTENSIONS[image_format]}'
+
+
+def _encode(image, image_format):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **SAVE_OPTIONS[image_format])
+    return ContentFile(buffer.getvalue())
+
+
+def get_image_size(file):
+    """Ширина и высота фото с учётом EXIF-поворота, по одному заголовку."""
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+                width, height = height, width
+    finally:
+        file.seek(0)
+    return width, height
+
+
+def get_placeholder_color(image):
+    """Преобладающий цвет фото в виде #rrggbb для заглушки в разметке."""
+    small = image.copy()
+    small.thumbnail((64, 64))
+    small = small.convert('RGB').quantize(colors=4)
+    _, index = max(small.getcolors())
+    red, green, blue = small.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def read_image_meta(name, storage, with_placeholder=False):
+    """Размеры и вес фото по заголовку файла.
+
+    Растр декодируется, только если нужна заглушка, и то в уменьшенном
+    масштабе.
+    """
+    with storage.open(name) as file:
+        width, height = get_image_size(file)
+        meta = {'width': width, 'height': height, 'file_size': file.size}
+        if with_placeholder:
+            with Image.open(file) as image:
+                image.draft('RGB', (64, 64))
+                meta['placeholder'] = get_placeholder_color(
+                    ImageOps.exif_transpose(image)
+                )
+    return meta
+
+
+def update_image_meta(post):
+    """Сохраняет параметры нового фото поста в ImageMeta.
+
+    Заглушку позже добавит обработчик очереди вместе с копиями.
+    """
+    ImageMeta = apps.get_model('blog', 'ImageMeta')
+    meta = None
+    if post.image:
+        try:
+            meta = read_image_meta(post.image.name, post.image.storage)
+        except OSError:
+            logger.exception('Не удалось прочитать фото %s', post.image.name)
+    if meta is None:
+        ImageMeta.objects.filter(post=post).delete()
+        return
+    ImageMeta.objects.update_or_create(
+        post=post, defaults={**meta, 'placeholder': ''}
+    )
+
+
+def set_image_placeholder(post_id, placeholder):
+    ImageMeta = apps.get_model('blog', 'ImageMeta')
+    ImageMeta.objects.filter(post_id=post_id).update(placeholder=placeholder)
+
+
+def process_image(name, storage=None):
+    """Создаёт уменьшенные копии фото и считает цвет-заглушку.
+
+    Для каждой копии из `POST_IMAGE_RENDITIONS` и каждой её ширины,
+    меньшей ширины оригинала, сохраняются варианты в форматах
+    `POST_IMAGE_FORMATS` и в формате исходника. Возвращает словарь
+    с ключами `renditions` — значение для `Post.image_renditions`
+    (MIME-тип запасного формата и список вариантов с именем файла,
+    размерами и MIME-типом) — и `placeholder` для `ImageMeta`.
+    Файл читается и декодируется один раз. Копии сохраняются в то же
+    хранилище, что и `Post.image`, под именами от хеша оригинала.
+    """
+    if storage is None:
+        Post = apps.get_model('blog', 'Post')
+        storage = Post._meta.get_field('image').storage
+    result = {'renditions': {}, 'placeholder': ''}
+    try:
+        with storage.open(name) as original:
+            image = Image.open(original)
+            source_format = image.format
+            widths = sorted({
+                width
+                for rendition_widths in settings.POST_IMAGE_RENDITIONS.values()
+                for width in rendition_widths
+                if width < image.width
+            })
+            if source_format not in SOURCE_FORMATS:
+                widths = []
+            # Для JPEG декодируем сразу в уменьшенном масштабе.
+            draft_width = widths[-1] if widths else 64
+            image.draft('RGB', (
+                draft_width, -(-draft_width * image.height // image.width)
+            ))
+            image = ImageOps.exif_transpose(image)
+            result['placeholder'] = get_placeholder_color(image)
+            formats = get_output_formats(source_format) if widths else []
+
+            # Одна ширина может входить в несколько копий: файл общий.
+            variants = {}
+            for width in widths:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize(
+                    (width, height), Image.Resampling.LANCZOS
+                )
+                variants[width] = [
+                    {
+                        'name': storage.save_derived(
+                            variant_name(name, width, image_format),
+                            _encode(resized, image_format),
+                        ),
+                        'width': width,
+                        'height': height,
+                        'type': get_mime_type(image_format),
+                    }
+                    for image_format in formats
+                ]
+    except (OSError, Image.DecompressionBombError):
+        logger.exception('Не удалось обработать изображение %s', name)
+        return {'renditions': {}, 'placeholder': ''}
+
+    for rendition, rendition_widths in settings.POST_IMAGE_RENDITIONS.items():
+        rendition_variants = [
+            variant
+            for width in sorted(rendition_widths)
+            for variant in variants.get(width, ())
+        ]
+        if rendition_variants:
+            result['renditions'][rendition] = {
+                'fallback': get_mime_type(source_format),
+                'variants': rendition_variants,
+            }
+    return result
+
+
+def update_renditions(post):
+    if post.image:
+        result = process_image(post.image.name, post.image.storage)
+    else:
+        result = {'renditions': {}, 'placeholder': ''}
+    post.image_renditions = result['renditions']
+    set_image_placeholder(post.pk, result['placeholder'])
+    post.save(update_fields=('image_renditions', 'updated_at'))
+
+
+def get_modified_time(name, storage):
+    try:
+        return storage.get_modified_time(name)
+    except FileNotFoundError:
+        return None
+
+
+def release_image(name, renditions, storage, modified_time):
+    """Удаляет фото и его копии, если на них больше не ссылается пост.
+
+    Одинаковые загрузки хранятся одним файлом, поэтому число ссылок
+    считается по постам с тем же `image` (поле проиндексировано).
+    Загрузка тех же байтов могла уже переиспользовать файл, но ещё не
+    сохранить свой пост: хранилище тогда обновило время изменения, и
+    если оно отличается от `modified_time`, снятого при планировании
+    освобождения, файлы не удаляются.
+    """
+    Post = apps.get_model('blog', 'Post')
+    if not name or Post.objects.filter(image=name).exists():
+        return
+    if get_modified_time(name, storage) != modified_time:
+        return
+    names = [name] + [
+        variant['name']
+        for data in (renditions or {}).values()
+        for variant in data.get('variants', ())
+    ]
+    for file_name in names:
+        storage.delete(file_name)
+
+
+def process_post_image(post):
+    """Ставит фото поста в очередь или обрабатывает сразу.
+
+    До появления копий шаблоны показывают оригинал.
+    """
+    if not post.image:
+        return
+    if settings.POST_IMAGE_PROCESSING == 'sync':
+        update_renditions(post)
+        return
+    ImageJob = apps.get_model('blog', 'ImageJob')
+    ImageJob.objects.create(post=post, image=post.image.name)
+
+
+def claim_image_jobs(limit):
+    ImageJob = apps.get_model('blog', 'ImageJob')
+    pending = ImageJob.objects.filter(
+        status=ImageJob.Status.PENDING
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    # Условный UPDATE по одной задаче: параллельный обработчик
+    # не заберёт ту же задачу.
+    for pk in pending:
+        if ImageJob.objects.filter(
+            pk=pk, status=ImageJob.Status.PENDING
+        ).update(
+            status=ImageJob.Status.RUNNING,
+            attempts=F('attempts') + 1,
+            updated_at=timezone.now(),
+        ):
+            claimed.append(pk)
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+def requeue_stale_image_jobs(older_than):
+    ImageJob = apps.get_model('blog', 'ImageJob')
+    return ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=older_than),
+    ).update(status=ImageJob.Status.PENDING)
+
+
+def complete_image_job(job, result):
+    Post = apps.get_model('blog', 'Post')
+    # Пока задача ждала, фото могли заменить: копии старого не нужны.
+    post = Post.objects.filter(pk=job.post_id, image=job.image).first()
+    if post is not None:
+        post.image_renditions = result['renditions']
+        set_image_placeholder(post.pk, result['placeholder'])
+        post.save(update_fields=('image_renditions', 'updated_at'))
+    job.status = job.Status.DONE
+    job.error = ''
+    job.save(update_fields=('status', 'error', 'updated_at'))
+
+
+def fail_image_job(job, error):
+    if job.attempts < settings.POST_IMAGE_MAX_ATTEMPTS:
+        job.status = job.Status.PENDING
+    else:
+        job.status = job.Status.FAILED
+    job.error = error
+    job.save(update_fields=('status', 'error', 'updated_at'))
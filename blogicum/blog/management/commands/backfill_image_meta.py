@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.cache import FEEDS_NAMESPACE, bump_versions
+from blog.images import read_image_meta
+from blog.models import ImageMeta, Post
+
+FIELDS = ('width', 'height', 'file_size', 'placeholder')
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет размеры, вес и цвет-заглушку фото для постов, '
+        'у которых их ещё нет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать параметры и для постов, у которых они есть.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов обрабатывать за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            posts = posts.filter(
+                Q(image_meta__isnull=True) | Q(image_meta__placeholder='')
+            )
+        storage = Post._meta.get_field('image').storage
+        processed = failed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).values_list(
+                    'pk', 'image'
+                )[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            metas = []
+            for pk, name in batch:
+                try:
+                    meta = read_image_meta(
+                        name, storage, with_placeholder=True
+                    )
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f'{name}: {error}')
+                    continue
+                metas.append(ImageMeta(post_id=pk, **meta))
+            self.save_batch(metas)
+            processed += len(metas)
+            self.stdout.write(f'Обработано постов: {processed}')
+
+        if processed:
+            bump_versions(FEEDS_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, обработано постов: {processed}, ошибок: {failed}.'
+        ))
+
+    @transaction.atomic
+    def save_batch(self, metas):
+        pks = [meta.post_id for meta in metas]
+        existing = set(
+            ImageMeta.objects.filter(post_id__in=pks).values_list(
+                'post_id', flat=True
+            )
+        )
+        ImageMeta.objects.bulk_update(
+            [meta for meta in metas if meta.post_id in existing], FIELDS
+        )
+        ImageMeta.objects.bulk_create(
+            [meta for meta in metas if meta.post_id not in existing]
+        )
+        # Карточки кешируются по updated_at: без этого старые останутся
+        # без размеров и заглушки.
+        Post.objects.filter(pk__in=pks).update(updated_at=timezone.now())
@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blogicum.db.base import apply_pragmas
+
+# Профиль Django по умолчанию: журнал DELETE, отложенные транзакции и
+# стандартный тайм-аут модуля sqlite3.
+PROFILES = {
+    'default': ({}, 'DEFERRED'),
+    'tuned': (settings.SQLITE_PRAGMAS, 'IMMEDIATE'),
+}
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, comments_count INTEGER)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT, created REAL)',
+    'CREATE INDEX comment_post_idx ON comment (post_id, created)',
+)
+POSTS = 100
+
+
+def _connect(path, pragmas):
+    connection = sqlite3.connect(path, isolation_level=None, timeout=5)
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+def _prepare(path):
+    connection = sqlite3.connect(path, isolation_level=None)
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.executemany(
+        'INSERT INTO post (id, comments_count) VALUES (?, 0)',
+        [(pk,) for pk in range(1, POSTS + 1)],
+    )
+    connection.close()
+
+
+def _writer(path, pragmas, mode, deadline, stats, number):
+    # Как CommentCreateView: комментарий и счётчик в одной транзакции.
+    connection = _connect(path, pragmas)
+    post_id = number % POSTS + 1
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(f'BEGIN {mode}')
+            connection.execute(
+                'SELECT comments_count FROM post WHERE id = ?', (post_id,)
+            ).fetchone()
+            connection.execute(
+                'INSERT INTO comment (post_id, text, created) '
+                'VALUES (?, ?, ?)',
+                (post_id, 'Текст комментария' * 5, time.time()),
+            )
+            connection.execute(
+                'UPDATE post SET comments_count = comments_count + 1 '
+                'WHERE id = ?', (post_id,),
+            )
+            connection.execute('COMMIT')
+            stats['writes'] += 1
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            stats['errors'] += 1
+    connection.close()
+
+
+def _reader(path, pragmas, deadline, stats, number):
+    # Как страница поста: последние комментарии и их число.
+    connection = _connect(path, pragmas)
+    post_id = number % POSTS + 1
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(
+                'SELECT id, text FROM comment WHERE post_id = ? '
+                'ORDER BY created DESC LIMIT 50', (post_id,),
+            ).fetchall()
+            connection.execute(
+                'SELECT comments_count FROM post WHERE id = ?', (post_id,)
+            ).fetchone()
+            stats['reads'] += 1
+        except sqlite3.OperationalError:
+            stats['errors'] += 1
+    connection.close()
+
+
+def run_benchmark(profile, readers, writers, duration):
+    pragmas, mode = PROFILES[profile]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        _prepare(path)
+        deadline = time.monotonic() + duration
+        stats = [
+            {'reads': 0, 'writes': 0, 'errors': 0}
+            for _ in range(readers + writers)
+        ]
+        threads = [
+            threading.Thread(
+                target=_reader,
+                args=(path, pragmas, deadline, stats[i], i),
+            )
+            for i in range(readers)
+        ] + [
+            threading.Thread(
+                target=_writer,
+                args=(path, pragmas, mode, deadline, stats[readers + i], i),
+            )
+            for i in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return {
+        key: sum(item[key] for item in stats)
+        for key in ('reads', 'writes', 'errors')
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite на чтение и запись '
+        'с настройками по умолчанию и с профилем SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8,
+            help='Число читающих потоков.',
+        )
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Число пишущих потоков.',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5.0,
+            help='Длительность каждого прогона в секундах.',
+        )
+        parser.add_argument(
+            '--profile', choices=sorted(PROFILES), action='append',
+            help='Какие профили сравнивать (по умолчанию все).',
+        )
+
+    def handle(self, *args, **options):
+        for profile in options['profile'] or PROFILES:
+            result = run_benchmark(
+                profile, options['readers'], options['writers'],
+                options['duration'],
+            )
+            seconds = options['duration']
+            self.stdout.write(
+                f'{profile}: чтений {result["reads"] / seconds:.0f}/с, '
+                f'записей {result["writes"] / seconds:.0f}/с, '
+                f'ошибок «database is locked»: {result["errors"]}'
+            )
@@ -0,0 +1,103 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.css import SAFELIST, build, collect_classes
+
+# Шаблоны, из которых состоит первый экран ленты.
+CRITICAL_TEMPLATES = (
+    'base.html', 'includes/header.html', 'includes/post_card.html',
+)
+CRITICAL_HEADER = (
+    '{# Создаётся командой build_css, не редактировать вручную. #}'
+)
+
+
+def _sizes(content):
+    data = content.encode()
+    return len(data), len(gzip.compress(data, compresslevel=9))
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает из Bootstrap стили только для классов из шаблонов и '
+        'критический CSS первого экрана для встраивания в base.html.'
+    )
+
+    def add_arguments(self, parser):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        templates_dir = Path(settings.TEMPLATES[0]['DIRS'][0])
+        parser.add_argument(
+            '--source', type=Path,
+            default=static_dir / 'css' / 'bootstrap.min.css',
+            help='Полная таблица стилей Bootstrap.',
+        )
+        parser.add_argument(
+            '--templates', type=Path, default=templates_dir,
+            help='Каталог шаблонов, в которых ищутся классы.',
+        )
+        parser.add_argument(
+            '--output', type=Path,
+            default=static_dir / 'css' / 'site.min.css',
+            help='Куда записать очищенную таблицу стилей.',
+        )
+        parser.add_argument(
+            '--critical-output', type=Path,
+            default=templates_dir / 'includes' / 'critical_css.html',
+            help='Шаблон с критическим CSS, который встраивает base.html.',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Ничего не записывать, а упасть, если файлы устарели.',
+        )
+
+    def handle(self, *args, **options):
+        templates = options['templates']
+        classes = collect_classes(sorted(templates.rglob('*.html')))
+        critical_classes = collect_classes(
+            templates / name for name in CRITICAL_TEMPLATES
+        )
+        source = options['source'].read_text(encoding='utf-8')
+        purged, critical = build(source, classes | SAFELIST, critical_classes)
+        outputs = {
+            options['output']: purged + '\n',
+            options['critical_output']: (
+                CRITICAL_HEADER
+                + '{% verbatim %}' + critical + '{% endverbatim %}\n'
+            ),
+        }
+
+        if options['check']:
+            stale = [
+                str(path) for path, content in outputs.items()
+                if not path.exists()
+                or path.read_text(encoding='utf-8') != content
+            ]
+            if stale:
+                raise CommandError(
+                    'Стили устарели, запустите build_css: '
+                    + ', '.join(stale)
+                )
+        else:
+            for path, content in outputs.items():
+                path.write_text(content, encoding='utf-8')
+
+        for title, content in (
+            ('Bootstrap целиком', source),
+            ('Очищенные стили', purged),
+            ('Критический CSS', critical),
+        ):
+            raw, compressed = _sizes(content)
+            self.stdout.write(
+                f'{title}: {raw / 1024:.1f} КБ, '
+                f'gzip {compressed / 1024:.1f} КБ'
+            )
+        blocking_before = _sizes(source)[1]
+        blocking_after = _sizes(critical)[1]
+        self.stdout.write(self.style.SUCCESS(
+            'Блокирующий отрисовку CSS (gzip): '
+            f'{blocking_before / 1024:.1f} КБ → '
+            f'{blocking_after / 1024:.1f} КБ встроенных в страницу.'
+        ))
@@ -0,0 +1,78 @@
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.models import Category, Comment, Post
+
+User = get_user_model()
+
+# SCAN — полный проход по таблице или по всему индексу, в отличие
+# от SEARCH по ключу. Старые версии SQLite пишут «SCAN TABLE blog_post».
+FULL_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN QUERY PLAN для запросов лент и завершается '
+        'с ошибкой, если какой-то из них полностью просматривает таблицу '
+        'постов или комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default='default',
+            help='Псевдоним базы данных для проверки.',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                'EXPLAIN QUERY PLAN поддерживается только для SQLite.'
+            )
+        checked_tables = {Post._meta.db_table, Comment._meta.db_table}
+
+        failed = []
+        for name, queryset in self.get_feed_queries():
+            plan = queryset.using(options['database']).explain()
+            self.stdout.write(f'{name}:\n{plan}\n')
+            scanned = checked_tables.intersection(FULL_SCAN_RE.findall(plan))
+            if scanned:
+                failed.append(f'{name} ({", ".join(sorted(scanned))})')
+
+        if failed:
+            raise CommandError(
+                'Полный просмотр таблицы в запросах: ' + '; '.join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Все запросы лент используют индексы.'
+        ))
+
+    def get_feed_queries(self):
+        per_page = settings.POSTS_PER_PAGE
+        # Значения параметров не важны для плана, объекты не сохраняются.
+        category = Category(pk=1)
+        author = User(pk=1)
+        viewer = User(pk=2)
+        return [
+            ('index', Post.objects.published().for_feed()[:per_page]),
+            (
+                'category',
+                category.posts.published().for_feed()[:per_page],
+            ),
+            (
+                'profile',
+                author.posts.visible_to(viewer).for_feed()[:per_page],
+            ),
+            (
+                'profile (owner)',
+                author.posts.visible_to(author).for_feed()[:per_page],
+            ),
+            (
+                'comments',
+                Comment.objects.filter(post_id=1).select_related('author'),
+            ),
+        ]
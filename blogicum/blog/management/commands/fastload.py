@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DatabaseError, connection, transaction
+
+from blog.cache import GLOBAL_NAMESPACE, bump_versions
+from blog.dumps import (
+    FORMATS,
+    BulkLoader,
+    deserialize,
+    detect_format,
+    iter_records,
+    open_dump,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает фикстуру (JSON-массив, как у dumpdata, или '
+        'JSON Lines, можно .gz): читает файл потоком и вставляет записи '
+        'пакетами без сигналов в одной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу дампа.')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла (по умолчанию по расширению).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей одной модели вставлять за раз.',
+        )
+        parser.add_argument(
+            '-e', '--exclude', action='append', default=[],
+            help='Пропустить app_label или app_label.ModelName.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать записи, ключи которых уже есть в базе.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        path = options['fixture']
+        fmt = options['format'] or detect_format(path)
+        loader = BulkLoader(options['batch_size'], options['ignore_conflicts'])
+        started = time.monotonic()
+        try:
+            with open_dump(path) as stream, transaction.atomic():
+                with connection.constraint_checks_disabled():
+                    objects = deserialize(
+                        iter_records(stream, fmt), options['exclude']
+                    )
+                    for deserialized in objects:
+                        loader.add(deserialized)
+                counts = loader.finish()
+        except (OSError, ValueError, DeserializationError,
+                DatabaseError) as error:
+            raise CommandError(f'{path}: {error}')
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        # Сигналы не отправлялись: кеш страниц нужно сбросить вручную.
+        bump_versions(GLOBAL_NAMESPACE)
+        total = sum(counts.values())
+        for model, count in counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {elapsed:.2f} с '
+            f'({total / elapsed:.0f} записей/с).'
+        ))
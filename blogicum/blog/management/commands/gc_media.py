@@ -0,0 +1,97 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.media_gc import build_referenced_index, iter_orphans, remove_files
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT фото постов и их копии, на которые больше '
+        'не ссылается ни один пост.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать найденные файлы, ничего не удаляя.',
+        )
+        parser.add_argument(
+            '--quarantine', metavar='DIR',
+            help='Переносить файлы в этот каталог вместо удаления.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько файлов удалять за один подход.',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--max-set-size', type=int, default=1_000_000,
+            help=(
+                'Если ссылок больше, вместо множества используется '
+                'фильтр Блума: памяти нужно меньше, но часть сирот '
+                'может остаться.'
+            ),
+        )
+        parser.add_argument(
+            '--error-rate', type=float, default=0.001,
+            help='Доля ложных срабатываний фильтра Блума.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        field = Post._meta.get_field('image')
+        root = field.storage.path('')
+        if options['quarantine']:
+            options['quarantine'] = os.path.abspath(options['quarantine'])
+            scanned = os.path.join(root, field.upload_to)
+            if os.path.commonpath([scanned, options['quarantine']]) == scanned:
+                raise CommandError(
+                    'Каталог карантина не должен лежать внутри '
+                    f'{scanned}.'
+                )
+        referenced = build_referenced_index(
+            options['max_set_size'], options['error_rate']
+        )
+
+        found = freed = 0
+        batch = {}
+        orphans = iter_orphans(
+            root, field.upload_to, referenced, options['min_age']
+        )
+        for name, size in orphans:
+            if options['dry_run']:
+                found += 1
+                freed += size
+                self.stdout.write(name)
+                continue
+            batch[name] = size
+            if len(batch) >= options['batch_size']:
+                removed = self.remove_batch(root, batch, options)
+                found += len(removed)
+                freed += sum(batch[name] for name in removed)
+                batch = {}
+        if batch:
+            removed = self.remove_batch(root, batch, options)
+            found += len(removed)
+            freed += sum(batch[name] for name in removed)
+
+        if options['dry_run']:
+            action = 'Найдено'
+        elif options['quarantine']:
+            action = 'Перенесено в карантин'
+        else:
+            action = 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} файлов: {found}, {freed / 1024 / 1024:.1f} МБ.'
+        ))
+
+    def remove_batch(self, root, batch, options):
+        return remove_files(
+            root, batch, options['quarantine'], options['min_age']
+        )
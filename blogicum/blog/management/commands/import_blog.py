@@ -0,0 +1,68 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DatabaseError, connection, transaction
+
+from blog.cache import GLOBAL_NAMESPACE, bump_versions
+from blog.dumps import BulkLoader, deserialize, iter_json_lines, open_dump
+from blog.models import Comment
+
+from .export_blog import EXPORTED
+
+ALLOWED = {model._meta.label_lower for model, _ in EXPORTED}
+
+
+def _checked(records):
+    for record in records:
+        if str(record.get('model', '')).lower() not in ALLOWED:
+            raise ValueError(
+                f'Неожиданная модель в выгрузке: {record.get("model")!r}.'
+            )
+        yield record
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_blog потоком: новые записи вставляет '
+        'пакетами, существующие с теми же ключами обновляет.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Файл выгрузки (.jsonl или .gz).')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей одной модели записывать за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        path = options['input']
+        loader = BulkLoader(options['batch_size'], update_existing=True)
+        started = time.monotonic()
+        try:
+            with open_dump(path) as stream, transaction.atomic():
+                with connection.constraint_checks_disabled():
+                    objects = deserialize(_checked(iter_json_lines(stream)))
+                    for deserialized in objects:
+                        loader.add(deserialized)
+                counts = loader.finish()
+        except (OSError, ValueError, DeserializationError,
+                DatabaseError) as error:
+            raise CommandError(f'{path}: {error}')
+        elapsed = max(time.monotonic() - started, 1e-6)
+
+        total = sum(counts.values())
+        for model, count in counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        if counts.get(Comment):
+            # При инкрементальной загрузке новые комментарии могут
+            # относиться к постам, которых нет в выгрузке.
+            call_command('recount_comments', stdout=self.stdout)
+        bump_versions(GLOBAL_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {total} за {elapsed:.2f} с '
+            f'({total / elapsed:.0f} записей/с).'
+        ))
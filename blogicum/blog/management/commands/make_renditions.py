@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import update_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото для уже загруженных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для постов, у которых они уже есть.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько постов загружать из БД за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            posts = posts.filter(image_renditions={})
+        processed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).only(
+                    'pk', 'image', 'image_renditions'
+                )[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                update_renditions(post)
+            processed += len(batch)
+            self.stdout.write(f'Обработано постов: {processed}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, обработано постов: {processed}.'
+        ))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.cache import FEEDS_NAMESPACE, bump_versions
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает Post.comments_count по таблице комментариев '
+        'пакетами и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов проверять за один запрос.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать число расхождений, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                posts = list(
+                    Post.objects.select_for_update().filter(
+                        pk__gt=last_pk
+                    ).order_by('pk').only('pk', 'comments_count')[:batch_size]
+                )
+                if not posts:
+                    break
+                last_pk = posts[-1].pk
+                counts = dict(
+                    Comment.objects.filter(
+                        post_id__in=[post.pk for post in posts]
+                    ).order_by().values_list('post_id').annotate(Count('pk'))
+                )
+                stale = []
+                for post in posts:
+                    actual = counts.get(post.pk, 0)
+                    if post.comments_count != actual:
+                        post.comments_count = actual
+                        stale.append(post)
+                if stale and not options['dry_run']:
+                    Post.objects.bulk_update(stale, ['comments_count'])
+            checked += len(posts)
+            fixed += len(stale)
+
+        if fixed and not options['dry_run']:
+            bump_versions(FEEDS_NAMESPACE)
+        action = 'Найдено' if options['dry_run'] else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {checked}. {action} расхождений: {fixed}.'
+        ))
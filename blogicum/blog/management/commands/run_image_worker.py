@@ -0,0 +1,151 @@
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import (
+    claim_image_jobs,
+    complete_image_job,
+    fail_image_job,
+    process_image,
+    requeue_stale_image_jobs,
+)
+
+
+def _init_worker():
+    # При запуске через spawn дочерний процесс начинает с чистого листа.
+    django.setup()
+
+
+class InlineExecutor:
+    """Выполняет задачи в текущем процессе: для отладки и тестов."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает очередь фото постов: создаёт уменьшенные копии '
+        'в пуле процессов по числу ядер.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов; 0 — обрабатывать в текущем процессе.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько задач забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--stale-after', type=int, default=600,
+            help='Через сколько секунд зависшая задача '
+                 'возвращается в очередь.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size'] or max(workers, 1) * 4
+        executor = self.make_executor(workers)
+        self.processed = 0
+        try:
+            while True:
+                requeued = requeue_stale_image_jobs(options['stale_after'])
+                if requeued:
+                    self.stdout.write(
+                        f'Возвращено в очередь задач: {requeued}'
+                    )
+                jobs = claim_image_jobs(batch_size)
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                broken = self.run_jobs(executor, jobs)
+                if broken:
+                    executor = self.recover(executor, workers, broken)
+        finally:
+            executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано задач: {self.processed}.'
+        ))
+
+    def make_executor(self, workers):
+        if not workers:
+            return InlineExecutor()
+        # Дочерние процессы не должны унаследовать открытые соединения
+        # с БД; с базой работает только этот процесс.
+        connections.close_all()
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker
+        )
+
+    def run_jobs(self, executor, jobs):
+        """Обрабатывает задачи и возвращает те, что прервал сломанный пул.
+
+        Если дочерний процесс убит системой (нехватка памяти, падение
+        кодека), пул ломается и все незавершённые задачи получают
+        BrokenProcessPool, хотя виновата лишь одна из них.
+        """
+        futures = {}
+        broken = []
+        for job in jobs:
+            try:
+                futures[executor.submit(process_image, job.image)] = job
+            except BrokenProcessPool:
+                broken.append(job)
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                broken.append(job)
+                continue
+            except Exception as error:
+                fail_image_job(job, repr(error))
+                self.stderr.write(f'{job}: {error!r}')
+            else:
+                complete_image_job(job, result)
+            self.processed += 1
+        return broken
+
+    def recover(self, executor, workers, broken):
+        """Пересоздаёт пул и повторяет прерванные задачи по одной.
+
+        Попытка засчитывается только задаче, которая роняет пул и в
+        одиночку; остальные просто доделываются.
+        """
+        executor.shutdown(wait=False)
+        executor = self.make_executor(workers)
+        for job in broken:
+            if self.run_jobs(executor, [job]):
+                error = 'Процесс обработки фото аварийно завершился.'
+                fail_image_job(job, error)
+                self.stderr.write(f'{job}: {error}')
+                self.processed += 1
+                executor.shutdown(wait=False)
+                executor = self.make_executor(workers)
+        return executor
@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.cache import GLOBAL_NAMESPACE, bump_versions
+from blog.seeding import Seeder
+
+
+def fraction(value):
+    value = float(value)
+    if not 0 <= value <= 1:
+        raise ValueError(value)
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, постами и '
+        'комментариями для нагрузочного тестирования. Данные '
+        'воспроизводимы по --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять одним bulk_create.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до сегодняшнего распределить посты.',
+        )
+        parser.add_argument(
+            '--future-fraction', type=fraction, default=0.02,
+            help='Доля отложенных постов.',
+        )
+        parser.add_argument(
+            '--unpublished-fraction', type=fraction, default=0.03,
+            help='Доля снятых с публикации постов.',
+        )
+        parser.add_argument(
+            '--images', type=fraction, default=0.0,
+            help='Доля постов с фото (по умолчанию без фото).',
+        )
+        parser.add_argument(
+            '--image-pool', type=int, default=10,
+            help='Сколько разных фото создать для постов.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        if min(options['users'], options['posts'], options['comments'],
+               options['categories'], options['locations']) < 0:
+            raise CommandError('Количества не могут быть отрицательными.')
+        if options['posts'] and not (
+                options['users'] and options['categories']):
+            raise CommandError(
+                'Для постов нужны хотя бы один пользователь и категория.'
+            )
+        if options['images'] and options['image_pool'] < 1:
+            raise CommandError('--image-pool должен быть положительным.')
+
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            future_fraction=options['future_fraction'],
+            unpublished_fraction=options['unpublished_fraction'],
+            image_fraction=options['images'],
+            image_pool=options['image_pool'],
+            log=self.stdout.write,
+        )
+        started = time.monotonic()
+        counts = seeder.run(
+            options['users'], options['posts'], options['comments'],
+            options['categories'], options['locations'],
+        )
+        elapsed = max(time.monotonic() - started, 1e-6)
+        bump_versions(GLOBAL_NAMESPACE)
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано записей: {total} за {elapsed:.2f} с '
+            f'({total / elapsed:.0f} записей/с).'
+        ))
@@ -0,0 +1,138 @@
+import hashlib
+import math
+import os
+import shutil
+import time
+
+from django.apps import apps
+from django.conf import settings
+
+
+class BloomFilter:
+    """Вероятностное множество фиксированного размера.
+
+    Ложные срабатывания возможны, пропуски — нет: для сборщика мусора это
+    значит, что часть сирот может остаться на диске, но файл, на который
+    ссылается пост, не удалится никогда.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(
+            int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8
+        )
+        self.hash_count = max(
+            int(round(self.size / capacity * math.log(2))), 1
+        )
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+def iter_referenced_names(chunk_size=2000):
+    """Имена фото и их копий из одного прохода по таблице постов."""
+    Post = apps.get_model('blog', 'Post')
+    rows = Post.objects.exclude(image='').order_by().values_list(
+        'image', 'image_renditions'
+    ).iterator(chunk_size=chunk_size)
+    for image, renditions in rows:
+        yield image
+        for data in (renditions or {}).values():
+            for variant in data.get('variants', ()):
+                yield variant['name']
+
+
+def build_referenced_index(max_set_size, error_rate=0.001):
+    """Собирает ссылки в множество или, если их много, в фильтр Блума."""
+    Post = apps.get_model('blog', 'Post')
+    # Оригинал плюс копия каждой ширины в каждом формате и в исходном.
+    per_post = 1 + sum(
+        len(widths) for widths in settings.POST_IMAGE_RENDITIONS.values()
+    ) * (len(settings.POST_IMAGE_FORMATS) + 1)
+    expected = Post.objects.exclude(image='').count() * per_post
+    referenced = (
+        set() if expected <= max_set_size
+        else BloomFilter(expected, error_rate)
+    )
+    for name in iter_referenced_names():
+        referenced.add(name)
+    return referenced
+
+
+def iter_media_files(root, prefix):
+    """Обходит каталог без построения полного списка файлов.
+
+    Возвращает пары (имя относительно MEDIA_ROOT, os.DirEntry); в памяти
+    одновременно держится только стек ещё не пройденных каталогов.
+    """
+    stack = [prefix]
+    while stack:
+        relative = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, relative))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = f'{relative}/{entry.name}' if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(name)
+                elif entry.is_file(follow_symlinks=False):
+                    yield name, entry
+
+
+def iter_orphans(root, prefix, referenced, min_age):
+    """Файлы старше `min_age` секунд, на которые не ссылается ни один пост.
+
+    Свежие файлы пропускаются: загрузка или обработка фото может быть
+    ещё не закоммичена.
+    """
+    threshold = time.time() - min_age
+    for name, entry in iter_media_files(root, prefix):
+        if name in referenced:
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > threshold:
+            continue
+        yield name, stat.st_size
+
+
+def remove_files(root, names, quarantine=None, min_age=0):
+    """Удаляет файлы или переносит их в карантин с тем же путём.
+
+    Время изменения проверяется ещё раз прямо перед удалением: пока
+    собирались ссылки, хранилище могло снова начать использовать файл
+    (см. `ContentAddressedStorage.touch`). Возвращает имена удалённых.
+    """
+    threshold = time.time() - min_age
+    removed = []
+    for name in names:
+        path = os.path.join(root, name)
+        try:
+            if os.stat(path).st_mtime > threshold:
+                continue
+            if quarantine:
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed.append(name)
+    return removed
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:52
+
+from django.db import migrations
+
+
+def reset_image_renditions(apps, schema_editor):
+    # Копии теперь хранятся по ширинам и форматам; старые записи
+    # сбрасываются, их пересоздаёт `manage.py make_renditions`.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(image_renditions={}).update(image_renditions={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(reset_image_renditions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:25
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_reset_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, max_length=255, storage=blog.storage.get_post_image_storage, upload_to='post_images', verbose_name='Фото'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_image_content_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageMeta',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image_meta', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('file_size', models.PositiveBigIntegerField(verbose_name='Размер файла, байт')),
+                ('placeholder', models.CharField(blank=True, help_text='Преобладающий цвет фото в виде #rrggbb.', max_length=7, verbose_name='Цвет-заглушка')),
+            ],
+            options={
+                'verbose_name': 'параметры фото',
+                'verbose_name_plural': 'Параметры фото',
+            },
+        ),
+    ]
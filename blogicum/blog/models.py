@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .storage import get_post_image_storage
 
 User = get_user_model()
 
@@ -59,6 +62,34 @@ class Location(models.Model):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+
+    def published(self):
+        return self.filter(self._published_q())
+
+    def visible_to(self, user):
+        # Автор видит свои посты, даже снятые с публикации
+        # или отложенные; остальные — только опубликованные.
+        if user.is_authenticated:
+            return self.filter(models.Q(author=user) | self._published_q())
+        return self.published()
+
+    def for_feed(self):
+        return self.select_related(
+            'author', 'location', 'category', 'image_meta'
+        ).defer(
+            'author__password', 'category__description'
+        ).order_by('-pub_date')
+
+    @staticmethod
+    def _published_q():
+        return models.Q(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+
 class Post(models.Model):
     title = models.CharField(
         verbose_name='Заголовок',
@@ -102,20 +133,89 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено',
     )
+    # Не auto_now: loaddata сохраняет «сырые» записи без pre_save, и
+    # фикстуры без этого поля падали бы на NOT NULL. Время правки
+    # ставит save().
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name='Изменено',
+    )
     image = models.ImageField(
         'Фото',
         upload_to='post_images',
+        storage=get_post_image_storage,
+        max_length=255,
+        db_index=True,
         blank=True
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев',
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженное фото: при замене или удалении поста
+        # старый файл освобождается (см. blog.signals).
+        instance._loaded_image = (
+            instance.__dict__.get('image'),
+            instance.__dict__.get('image_renditions'),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        super().save(*args, **kwargs)
 
     @property
     def comment_count(self):
-        return self.comments.count()
+        return self.comments_count
+
+    def get_image_url(self, rendition='original'):
+        # Если копия ещё не готова или фото меньше её размера,
+        # отдаём оригинал.
+        variants = self.get_image_variants(rendition)
+        fallback = self.image_renditions.get(rendition, {}).get('fallback')
+        variants = [v for v in variants if v['type'] == fallback]
+        if variants:
+            return self.image.storage.url(variants[-1]['name'])
+        return self.image.url
+
+    def get_image_variants(self, rendition):
+        data = self.image_renditions.get(rendition)
+        return data['variants'] if data else []
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -140,6 +240,100 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class ImageJob(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Обрабатывается'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='image_jobs',
+    )
+    image = models.CharField(
+        verbose_name='Файл',
+        max_length=100,
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    error = models.TextField(
+        verbose_name='Ошибка',
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class ImageMeta(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Публикация',
+        related_name='image_meta',
+    )
+    width = models.PositiveIntegerField(
+        verbose_name='Ширина',
+    )
+    height = models.PositiveIntegerField(
+        verbose_name='Высота',
+    )
+    file_size = models.PositiveBigIntegerField(
+        verbose_name='Размер файла, байт',
+    )
+    placeholder = models.CharField(
+        verbose_name='Цвет-заглушка',
+        max_length=7,
+        blank=True,
+        help_text='Преобладающий цвет фото в виде #rrggbb.',
+    )
+
+    class Meta:
+        verbose_name = 'параметры фото'
+        verbose_name_plural = 'Параметры фото'
+
+    def __str__(self):
+        return f'{self.width}×{self.height}, {self.file_size} байт'
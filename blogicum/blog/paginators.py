@@ -0,0 +1,268 @@
+import base64
+import binascii
+import json
+import math
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .cache import (
+    FEEDS_NAMESPACE,
+    GLOBAL_NAMESPACE,
+    get_next_publication_timeout,
+    get_page_cache_timeout,
+    get_versions,
+    may_be_stale,
+)
+
+
+class FeedPage(Page):
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+    @property
+    def page_links(self):
+        paginator = self.paginator
+        if not paginator.is_estimate:
+            return paginator.get_elided_page_range(
+                self.number, on_each_side=2, on_ends=1
+            )
+        # Общее число страниц неизвестно: ссылки только до следующей.
+        first = max(1, self.number - 2)
+        last = self.number + 1 if self.has_next() else self.number
+        links = [1] if first > 1 else []
+        if first > 2:
+            links.append(paginator.ELLIPSIS)
+        links.extend(range(first, last + 1))
+        return links
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не считает ленту на каждом запросе.
+
+    Число записей кешируется по `cache_key` с версиями пространств лент,
+    поэтому любая запись поста сбрасывает его. Подсчёт ограничен
+    `FEED_COUNT_LIMIT` строками: если записей больше, число считается
+    оценкой, а ссылки ведут не дальше следующей страницы.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, cache_key=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.cache_key = cache_key
+
+    @cached_property
+    def _count_and_estimate(self):
+        key = None
+        if self.cache_key is not None:
+            key = 'blog:count:{}:{}:{}'.format(
+                *get_versions((GLOBAL_NAMESPACE, FEEDS_NAMESPACE)),
+                self.cache_key,
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        limit = settings.FEED_COUNT_LIMIT
+        count = self.object_list[:limit + 1].count()
+        result = (limit, True) if count > limit else (count, False)
+        if key is not None and not may_be_stale(
+                (GLOBAL_NAMESPACE, FEEDS_NAMESPACE)):
+            cache.set(key, result, get_next_publication_timeout(
+                get_page_cache_timeout()
+            ))
+        return result
+
+    @property
+    def count(self):
+        return self._count_and_estimate[0]
+
+    @property
+    def is_estimate(self):
+        return self._count_and_estimate[1]
+
+    def validate_number(self, number):
+        if not self.is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        if not self.is_estimate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('На этой странице нет результатов')
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def get_page(self, number):
+        if not self.is_estimate:
+            return super().get_page(number)
+        try:
+            return self.page(self.validate_number(number))
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            # Номер за концом ленты: число страниц неизвестно, поэтому
+            # только здесь считаем записи точно.
+            last = math.ceil(self.object_list.count() / self.per_page)
+            return self.page(max(last, 1))
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage(Sequence):
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки вместо LIMIT/OFFSET.
+
+    Курсор хранит значения полей `ordering` для крайней записи страницы,
+    поэтому любая страница выбирается одним запросом по индексу и без
+    подсчёта общего числа записей. Последнее поле сортировки должно быть
+    уникальным, иначе записи с одинаковым ключом будут пропущены.
+    """
+
+    is_cursor = True
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self._fields = [name.lstrip('-') for name in self.ordering]
+
+    def get_page(self, cursor=None):
+        try:
+            values, backward = self.decode_cursor(cursor)
+        except ValueError:
+            values, backward = None, False
+
+        queryset = self.queryset.order_by(*self._get_ordering(backward))
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, backward))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backward:
+            if not rows:
+                return self.get_page()
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next and rows else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], backward=True)
+                if has_previous and rows else None
+            ),
+        )
+
+    def encode_cursor(self, obj, backward=False):
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name in self._fields
+        ]
+        payload = json.dumps([values, int(backward)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw_values, backward = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if len(raw_values) != len(self._fields):
+                raise ValueError
+            values = [
+                self._get_field(name).to_python(value)
+                for name, value in zip(self._fields, raw_values)
+            ]
+        except (binascii.Error, TypeError, UnicodeDecodeError,
+                ValidationError, ValueError):
+            raise ValueError(f'Некорректный курсор: {cursor!r}')
+        return values, bool(backward)
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        if name == 'pk':
+            return opts.pk
+        return opts.get_field(name)
+
+    def _get_ordering(self, backward):
+        if not backward:
+            return self.ordering
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def _seek_filter(self, values, backward):
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-') != backward
+            lookup = 'lt' if descending else 'gt'
+            equal_prefix = {
+                field: value
+                for field, value in zip(self._fields[:index], values)
+            }
+            condition |= Q(
+                **equal_prefix,
+                **{f'{self._fields[index]}__{lookup}': values[index]},
+            )
+        return condition
@@ -0,0 +1,299 @@
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+from PIL import Image
+
+from .dumps import BulkLoader, reset_sequences
+from .models import Category, Comment, ImageMeta, Location, Post
+
+User = get_user_model()
+
+VISIBLE, FUTURE, UNPUBLISHED = 0, 1, 2
+# Показатель Парето 1.16 даёт правило 80/20: пятая часть авторов пишет
+# около 80% постов, пятая часть постов собирает большую часть
+# комментариев.
+PARETO_ALPHA = 1.16
+POOL_SIZE = 1000
+IMAGE_SIZES = ((1600, 1200), (1200, 1600), (1280, 720), (800, 800))
+
+
+def pareto_weights(rng, count, alpha=PARETO_ALPHA):
+    """Накопленные веса со степенным распределением для rng.choices."""
+    return list(accumulate(rng.paretovariate(alpha) for _ in range(count)))
+
+
+def _next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+def _batches(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Seeder:
+    """Генератор синтетических данных для нагрузочного тестирования.
+
+    Тексты берутся из пулов, заранее заполненных Faker: вызывать его на
+    каждую строку при миллионах записей слишком долго. Все случайные
+    величины идут от `seed`, поэтому при одинаковых параметрах данные
+    совпадают; даты отсчитываются от начала текущего дня.
+    """
+
+    def __init__(self, seed=0, batch_size=5000, days=365,
+                 future_fraction=0.02, unpublished_fraction=0.03,
+                 image_fraction=0.0, image_pool=10, log=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.days = days
+        self.future_fraction = future_fraction
+        self.unpublished_fraction = unpublished_fraction
+        self.image_fraction = image_fraction
+        self.image_pool = image_pool
+        self.log = log or (lambda message: None)
+        self.now = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.titles = [
+            self.fake.sentence(nb_words=6)[:256] for _ in range(POOL_SIZE)
+        ]
+        self.paragraphs = [
+            self.fake.paragraph(nb_sentences=5) for _ in range(POOL_SIZE)
+        ]
+
+    def rng(self, stream):
+        # Отдельный поток на каждую величину: изменение одного параметра
+        # не сдвигает остальные.
+        return random.Random(f'{self.seed}:{stream}')
+
+    def run(self, users, posts, comments, categories=10, locations=50):
+        self.counts = {}
+        user_ids = self.create_users(users)
+        category_ids = self.create_categories(categories)
+        location_ids = self.create_locations(locations)
+        status = self.post_status(posts)
+        post_weights = self.comment_weights(status)
+        comments_count = self.count_comments(post_weights, comments)
+        post_ids = self.create_posts(
+            status, comments_count, user_ids, category_ids, location_ids
+        )
+        self.create_comments(post_ids, post_weights, comments, user_ids)
+        # Ключи заданы явно: последовательности нужно сдвинуть за них.
+        reset_sequences([User, Category, Location, Post])
+        return self.counts
+
+    def _bulk_create(self, model, objs):
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+
+    def _report(self, model, count, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.counts[model] = count
+        self.log(
+            f'{model._meta.label}: {count} '
+            f'({count / elapsed:.0f} записей/с)'
+        )
+
+    def _date_in_past(self, rng):
+        # Квадрат смещает даты к настоящему: активность со временем растёт.
+        return self.now - timedelta(days=self.days * rng.random() ** 2)
+
+    def create_users(self, count):
+        started = time.monotonic()
+        rng = self.rng('users')
+        first_pk = _next_pk(User)
+        first_names = [self.fake.first_name() for _ in range(POOL_SIZE)]
+        last_names = [self.fake.last_name() for _ in range(POOL_SIZE)]
+        logins = [self.fake.user_name() for _ in range(POOL_SIZE)]
+        password = make_password(None)
+        for start, size in _batches(count, self.batch_size):
+            objs = []
+            for pk in range(first_pk + start, first_pk + start + size):
+                login = f'{rng.choice(logins)}{pk}'
+                objs.append(User(
+                    pk=pk, username=login, email=f'{login}@example.org',
+                    first_name=rng.choice(first_names),
+                    last_name=rng.choice(last_names),
+                    password=password,
+                    date_joined=self._date_in_past(rng),
+                ))
+            self._bulk_create(User, objs)
+        self._report(User, count, started)
+        return range(first_pk, first_pk + count)
+
+    def create_categories(self, count):
+        started = time.monotonic()
+        first_pk = _next_pk(Category)
+        self._bulk_create(Category, [
+            Category(
+                pk=pk, title=self.fake.word().capitalize(),
+                description=self.fake.paragraph(nb_sentences=2),
+                slug=f'category-{pk}',
+            )
+            for pk in range(first_pk, first_pk + count)
+        ])
+        self._report(Category, count, started)
+        return range(first_pk, first_pk + count)
+
+    def create_locations(self, count):
+        started = time.monotonic()
+        first_pk = _next_pk(Location)
+        self._bulk_create(Location, [
+            Location(pk=pk, name=self.fake.city())
+            for pk in range(first_pk, first_pk + count)
+        ])
+        self._report(Location, count, started)
+        return range(first_pk, first_pk + count)
+
+    def post_status(self, count):
+        rng = self.rng('status')
+        future = self.future_fraction
+        unpublished = future + self.unpublished_fraction
+        status = bytearray(count)
+        for index in range(count):
+            value = rng.random()
+            if value < future:
+                status[index] = FUTURE
+            elif value < unpublished:
+                status[index] = UNPUBLISHED
+        return status
+
+    def comment_weights(self, status):
+        # Комментируют только опубликованные посты.
+        rng = self.rng('popularity')
+        return list(accumulate(
+            rng.paretovariate(PARETO_ALPHA) if value == VISIBLE else 0
+            for value in status
+        ))
+
+    def _comment_targets(self, post_weights, count):
+        rng = self.rng('comment-targets')
+        population = range(len(post_weights))
+        for _, size in _batches(count, self.batch_size):
+            yield rng.choices(population, cum_weights=post_weights, k=size)
+
+    def count_comments(self, post_weights, count):
+        counts = array('I', bytes(4 * len(post_weights)))
+        if not post_weights or not post_weights[-1]:
+            return counts
+        for targets in self._comment_targets(post_weights, count):
+            for index in targets:
+                counts[index] += 1
+        return counts
+
+    def create_posts(self, status, comments_count, user_ids, category_ids,
+                     location_ids):
+        started = time.monotonic()
+        rng = self.rng('posts')
+        authors = pareto_weights(self.rng('authors'), len(user_ids))
+        categories = pareto_weights(self.rng('categories'), len(category_ids))
+        images = self.create_image_pool()
+        first_pk = _next_pk(Post)
+        # Даты публикации нужны комментариям, которые пишутся позже.
+        self.pub_dates = array('d', bytes(8 * len(status)))
+        for start, size in _batches(len(status), self.batch_size):
+            posts, metas = [], []
+            author_ids = rng.choices(user_ids, cum_weights=authors, k=size)
+            post_categories = rng.choices(
+                category_ids, cum_weights=categories, k=size
+            )
+            for offset in range(size):
+                index = start + offset
+                post = Post(
+                    pk=first_pk + index,
+                    title=rng.choice(self.titles),
+                    text='\n\n'.join(
+                        rng.choices(self.paragraphs, k=rng.randint(1, 6))
+                    ),
+                    pub_date=self._pub_date(rng, status[index]),
+                    is_published=status[index] != UNPUBLISHED,
+                    author_id=author_ids[offset],
+                    category_id=post_categories[offset],
+                    location_id=(
+                        rng.choice(location_ids)
+                        if location_ids and rng.random() < 0.7 else None
+                    ),
+                    comments_count=comments_count[index],
+                )
+                self.pub_dates[index] = post.pub_date.timestamp()
+                if images and rng.random() < self.image_fraction:
+                    name, meta = rng.choice(images)
+                    post.image = name
+                    metas.append(ImageMeta(post_id=post.pk, **meta))
+                posts.append(post)
+            self._bulk_create(Post, posts)
+            self._bulk_create(ImageMeta, metas)
+        self._report(Post, len(status), started)
+        return range(first_pk, first_pk + len(status))
+
+    def _pub_date(self, rng, status):
+        if status == FUTURE:
+            return self.now + timedelta(days=30 * rng.random(), hours=1)
+        return self._date_in_past(rng)
+
+    def create_image_pool(self):
+        """Сохраняет несколько JPEG, на которые ссылаются посты с фото.
+
+        Хранилище адресует файлы по содержимому, так что повторный запуск
+        с тем же seed не создаёт новых файлов.
+        """
+        if not self.image_fraction:
+            return []
+        rng = self.rng('images')
+        storage = Post._meta.get_field('image').storage
+        pool = []
+        for _ in range(self.image_pool):
+            size = rng.choice(IMAGE_SIZES)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            buffer = BytesIO()
+            Image.new('RGB', size, color).save(buffer, 'JPEG', quality=85)
+            name = storage.save(
+                'post_images/seed.jpg', ContentFile(buffer.getvalue())
+            )
+            pool.append((name, {
+                'width': size[0], 'height': size[1],
+                'file_size': buffer.tell(),
+                'placeholder': '#{:02x}{:02x}{:02x}'.format(*color),
+            }))
+        return pool
+
+    def create_comments(self, post_ids, post_weights, count, user_ids):
+        started = time.monotonic()
+        if not post_weights or not post_weights[-1]:
+            count = 0
+        rng = self.rng('comments')
+        authors = pareto_weights(self.rng('commenters'), len(user_ids))
+        # Вставка «сырая», как в fastload: auto_now_add не перезапишет
+        # дату комментария.
+        loader = BulkLoader(self.batch_size)
+        pk = _next_pk(Comment)
+        now = self.now.timestamp()
+        # Тот же поток, что и в count_comments: счётчики сойдутся.
+        targets = self._comment_targets(post_weights, count)
+        for batch in targets:
+            author_ids = rng.choices(
+                user_ids, cum_weights=authors, k=len(batch)
+            )
+            for index, author_id in zip(batch, author_ids):
+                # Комментарий пишется между публикацией поста и «сейчас».
+                published = self.pub_dates[index]
+                created = published + (now - published) * rng.random()
+                loader.add_object(Comment(
+                    pk=pk, post_id=post_ids[index], author_id=author_id,
+                    text=rng.choice(self.titles),
+                    created=datetime.fromtimestamp(created, timezone.utc),
+                ))
+                pk += 1
+        loader.finish()
+        self._report(Comment, count, started)
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import (
+    FEEDS_NAMESPACE,
+    GLOBAL_NAMESPACE,
+    bump_versions,
+    post_namespace,
+)
+from .images import (
+    get_modified_time,
+    process_post_image,
+    release_image,
+    update_image_meta,
+)
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+
+# Карточка поста кешируется по id, updated_at, числу комментариев, имени
+# автора и версии общего пространства: правка поста обновляет updated_at
+# сама, новый или удалённый комментарий меняет число, переименование
+# автора — имя. Категория и местоположение выводятся в карточке, поэтому
+# их изменение сбрасывает общую версию, не трогая строки постов.
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_related_posts(sender, instance, **kwargs):
+    bump_versions(GLOBAL_NAMESPACE)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    bump_versions(FEEDS_NAMESPACE, post_namespace(instance.pk))
+
+
+def _image_replaced(instance, update_fields, raw):
+    """Сменилось ли фото по сравнению с загруженным из БД.
+
+    Загруженное значение запоминает Post.from_db, а обновляет
+    release_replaced_image, поэтому обработчики, которые его сравнивают,
+    должны стоять раньше неё.
+    """
+    if raw or update_fields is not None and 'image' not in update_fields:
+        return False
+    loaded_image, _ = getattr(instance, '_loaded_image', (None, None))
+    return (loaded_image or '') != instance.image.name
+
+
+# Копии старого фото не подходят новому, а их файлы освободит
+# release_replaced_image: до обработки шаблоны показывают оригинал.
+@receiver(pre_save, sender=Post)
+def reset_replaced_renditions(sender, instance, update_fields, raw,
+                              **kwargs):
+    if _image_replaced(instance, update_fields, raw):
+        instance.image_renditions = {}
+
+
+# Размеры и вес фото сохраняются в ImageMeta, чтобы шаблонам не
+# приходилось открывать файл.
+@receiver(post_save, sender=Post)
+def store_image_meta(sender, instance, update_fields, raw, **kwargs):
+    if _image_replaced(instance, update_fields, raw):
+        update_image_meta(instance)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, update_fields, raw, **kwargs):
+    if _image_replaced(instance, update_fields, raw):
+        process_post_image(instance)
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, update_fields, raw,
+                           **kwargs):
+    loaded_image, loaded_renditions = getattr(
+        instance, '_loaded_image', (None, None)
+    )
+    if raw or update_fields is not None and 'image' not in update_fields:
+        return
+    if loaded_image and loaded_image != instance.image.name:
+        storage = instance.image.storage
+        modified = get_modified_time(loaded_image, storage)
+        transaction.on_commit(lambda: release_image(
+            loaded_image, loaded_renditions, storage, modified
+        ))
+    instance._loaded_image = (instance.image.name, instance.image_renditions)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    name = instance.image.name
+    renditions = instance.image_renditions
+    storage = instance.image.storage
+    modified = get_modified_time(name, storage) if name else None
+    transaction.on_commit(
+        lambda: release_image(name, renditions, storage, modified)
+    )
+
+
+# Фикстуры (loaddata) сохраняются «сырыми»: счётчик уже записан в дампе
+# поста, а файлов фото может не быть.
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') + 1
+        )
+
+
+# Срабатывает и при каскадном удалении комментариев вместе с постом
+# или пользователем, и при удалении через админку.
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comments_count__gt=0).update(
+        comments_count=F('comments_count') - 1
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, created=False, **kwargs):
+    namespaces = [post_namespace(instance.post_id)]
+    # Правка текста не меняет число комментариев в карточках лент.
+    if created or kwargs['signal'] is post_delete:
+        namespaces.append(FEEDS_NAMESPACE)
+    bump_versions(*namespaces)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, update_fields,
+                            **kwargs):
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    bump_versions(GLOBAL_NAMESPACE)
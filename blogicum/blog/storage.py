@@ -0,0 +1,83 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{64}\.')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именем, вычисленным из SHA-256 содержимого.
+
+    `post_images/photo.jpg` сохраняется как
+    `post_images/ab/cd/abcd….jpg`: одинаковые загрузки попадают в один
+    файл, а вложенные каталоги не дают одной папке разрастись. Имя,
+    пришедшее от клиента, на результат не влияет: хешируется всегда
+    содержимое. Копии, производные от оригинала, сохраняются через
+    `save_derived`. Удалять файл можно, только когда на него не
+    ссылается ни один пост, — см. `blog.images.release_image`.
+    """
+
+    def __init__(self, shard_levels=2, shard_width=2, **kwargs):
+        super().__init__(**kwargs)
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, self.content_hash(content))
+        if self.touch(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_derived(self, name, content):
+        """Сохраняет файл, производный от сохранённого оригинала.
+
+        Имя строит приложение из хешированного имени оригинала (см.
+        `blog.images.variant_name`), поэтому одинаковые оригиналы дают
+        одни и те же копии, и повторно сохранять их не нужно.
+        """
+        if not HASHED_NAME_RE.match(os.path.basename(name)):
+            raise ValueError(f'Имя копии не основано на хеше: {name}')
+        if self.touch(name):
+            return name
+        return super().save(name, content)
+
+    def touch(self, name):
+        """Обновляет время изменения файла, если он уже есть.
+
+        Повторно используемый файл выглядит свежим, и gc_media не удалит
+        его, пока новая ссылка на него ещё не закоммичена.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def content_hash(self, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        return digest.hexdigest()
+
+    def hashed_name(self, name, digest):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        shards = [
+            digest[i * self.shard_width:(i + 1) * self.shard_width]
+            for i in range(self.shard_levels)
+        ]
+        return os.path.join(directory, *shards, digest + ext)
+
+
+def get_post_image_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,21 @@
+from django import template
+
+from blog.cache import GLOBAL_NAMESPACE, get_versions
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cache_version(context):
+    """Версия общего пространства кеша для ключей фрагментов.
+
+    Сигналы увеличивают её при правке категорий, местоположений и
+    авторов. Читается один раз на запрос, а не на каждую карточку.
+    """
+    request = context.get('request')
+    version = getattr(request, '_blog_cache_version', None)
+    if version is None:
+        version, = get_versions([GLOBAL_NAMESPACE])
+        if request is not None:
+            request._blog_cache_version = version
+    return version
@@ -0,0 +1,49 @@
+from itertools import groupby
+
+from django import template
+from django.core.exceptions import ObjectDoesNotExist
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, rendition, lazy=True, sizes=DEFAULT_SIZES):
+    variants = post.get_image_variants(rendition)
+    fallback = post.image_renditions.get(rendition, {}).get('fallback')
+    storage = post.image.storage
+    sources = []
+    fallback_srcset = ''
+    for mime_type, group in groupby(
+        sorted(variants, key=lambda v: (v['type'] == fallback, v['type'])),
+        key=lambda v: v['type'],
+    ):
+        srcset = ', '.join(
+            f'{storage.url(v["name"])} {v["width"]}w' for v in group
+        )
+        if mime_type == fallback:
+            fallback_srcset = srcset
+        else:
+            sources.append({'type': mime_type, 'srcset': srcset})
+    try:
+        meta = post.image_meta
+    except ObjectDoesNotExist:
+        meta = None
+    # Размеры берутся из БД, чтобы браузер заранее оставил место под фото.
+    largest = max(
+        variants, key=lambda v: v['width'], default={
+            'width': meta and meta.width, 'height': meta and meta.height,
+        },
+    )
+    return {
+        'sources': sources,
+        'src': post.get_image_url(rendition),
+        'srcset': fallback_srcset,
+        'sizes': sizes,
+        'width': largest['width'],
+        'height': largest['height'],
+        'placeholder': meta.placeholder if meta else '',
+        'lazy': lazy,
+        'alt': post.title,
+    }
@@ -0,0 +1,87 @@
+import warnings
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# Сколько байт накопить, прежде чем пробовать прочитать заголовок фото.
+HEADER_BYTES = 64 * 1024
+
+
+class PostImageUploadHandler(TemporaryFileUploadHandler):
+    """Потоково пишет фото во временный файл и рано отсекает лишнее.
+
+    Как только размер превышает POST_IMAGE_MAX_UPLOAD_SIZE или заголовок
+    показывает больше POST_IMAGE_MAX_PIXELS пикселей, запись прекращается,
+    а у файла появляется `upload_error` — его показывает `PostImageField`.
+    Для проверки читается только заголовок, растр не декодируется.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file.upload_error = None
+        self.received = 0
+        self.header_checked = False
+        if (
+            self.content_length
+            and self.content_length > settings.POST_IMAGE_MAX_UPLOAD_SIZE
+        ):
+            self.reject_size()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.file.upload_error:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            self.reject_size()
+            return None
+        self.file.write(raw_data)
+        if not self.header_checked and self.received >= HEADER_BYTES:
+            self.check_header(final=False)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.file.upload_error and not self.header_checked:
+            self.check_header(final=True)
+        if self.file.upload_error:
+            file_size = 0
+        return super().file_complete(file_size)
+
+    def check_header(self, final):
+        self.file.flush()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+                with Image.open(self.file.temporary_file_path()) as image:
+                    width, height = image.size
+        except Image.DecompressionBombError:
+            self.reject(self.pixels_error())
+            return
+        except Exception:
+            # Заголовок ещё не дочитан или это не фото: в последнем
+            # случае ошибку покажет проверка ImageField.
+            self.header_checked = final
+            return
+        self.header_checked = True
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            self.reject(self.pixels_error())
+
+    def pixels_error(self):
+        limit = f'{settings.POST_IMAGE_MAX_PIXELS:,}'.replace(',', ' ')
+        return (
+            'Слишком большое разрешение фото: допускается не больше '
+            f'{limit} пикселей.'
+        )
+
+    def reject_size(self):
+        self.reject(
+            'Файл слишком большой: допускается не больше '
+            f'{filesizeformat(settings.POST_IMAGE_MAX_UPLOAD_SIZE)}.'
+        )
+
+    def reject(self, message):
+        self.file.upload_error = message
+        # Уже записанное больше не нужно — освобождаем место на диске.
+        self.file.seek(0)
+        self.file.truncate()
@@ -1,11 +1,31 @@
-from django.utils import timezone
-from .models import Post
+from django.conf import settings
+from .paginators import CachedCountPaginator, CursorPaginator
 
 
-def get_published_posts():
+def uses_cursor_pagination():
+    return settings.FEED_PAGINATION == 'cursor'
 
-    return Post.objects.filter(
-        is_published=True,
-        pub_date__lte=timezone.now(),
-        category__is_published=True
+
+def get_cursor_page(request, queryset, per_page=None):
+    paginator = CursorPaginator(
+        queryset, per_page or settings.POSTS_PER_PAGE
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def get_feed_page(request, queryset, count_cache_key=None):
+    if uses_cursor_pagination():
+        return get_cursor_page(request, queryset)
+    paginator = CachedCountPaginator(
+        queryset, settings.POSTS_PER_PAGE, cache_key=count_cache_key
+    )
+    return paginator.get_page(request.GET.get('page'))
+
+
+def get_comments_page(post, cursor=None):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        ordering=('created', 'id'),
     )
+    return paginator.get_page(cursor)
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.core.paginator import Paginator
 from django.views.generic import (
     ListView,
     DetailView,
@@ -7,14 +6,25 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
 )
-from django.utils import timezone
 from django.shortcuts import get_object_or_404, render
-from .utils import get_published_posts
+from .cache import FEEDS_NAMESPACE, anonymous_page_cache, post_namespace
+from .paginators import CachedCountPaginator
+from .uploads import PostImageUploadHandler
+from .utils import (
+    get_comments_page,
+    get_cursor_page,
+    get_feed_page,
+    uses_cursor_pagination,
+)
 from django.contrib.auth import get_user_model
 from django.urls import reverse_lazy
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import redirect
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from blogicum.db.routers import replica_reads
 
 from blog.forms import PostForm, CommentForm
 from .models import Post, Category, Comment
@@ -22,21 +32,38 @@ from .models import Post, Category, Comment
 User = get_user_model()
 
 
+class FeedPaginationMixin:
+    paginate_by = settings.POSTS_PER_PAGE
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        # None — CachedCountPaginator считает число записей без кеша.
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cache_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        page = get_cursor_page(self.request, queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+
 # Create your views here.
+@replica_reads
+@anonymous_page_cache(FEEDS_NAMESPACE)
 def profile(request, username):
     user = get_object_or_404(User, username=username)
-    if request.user == user:
-        posts = Post.objects.filter(author=user).order_by('-pub_date')
-    else:
-        posts = Post.objects.filter(
-            author=user,
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now(),
-        ).order_by('-pub_date')
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = user.posts.visible_to(request.user).for_feed()
+    scope = 'owner' if request.user == user else 'public'
+    page_obj = get_feed_page(
+        request, posts, count_cache_key=f'profile:{user.pk}:{scope}'
+    )
     template = 'blog/profile.html'
     context = {
         'profile': user,
@@ -63,7 +90,24 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostImageUploadMixin:
+    """Принимает фото через `PostImageUploadHandler`.
+
+    Обработчики загрузки можно заменить только до чтения request.POST,
+    а CsrfViewMiddleware читает его раньше view. Поэтому проверка CSRF
+    снимается с view и выполняется уже после замены обработчиков.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [PostImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class PostCreateView(PostImageUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     template_name = 'blog/create.html'
     form_class = PostForm
@@ -81,42 +125,68 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostListView(ListView):
+@method_decorator(replica_reads, name='dispatch')
+@method_decorator(anonymous_page_cache(FEEDS_NAMESPACE), name='dispatch')
+class PostListView(FeedPaginationMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
-    paginate_by = settings.POSTS_PER_PAGE
 
     def get_queryset(self):
-        return get_published_posts().order_by('-pub_date').select_related(
-            'author', 'location', 'category'
-        )
+        return Post.objects.published().for_feed()
 
+    def get_count_cache_key(self):
+        return 'index'
 
+
+@method_decorator(replica_reads, name='dispatch')
+@method_decorator(
+    anonymous_page_cache(post_namespace, until_next_publication=False),
+    name='dispatch',
+)
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
-    def get_object(self, queryset=None):
-        post = super().get_object(queryset)
-
-        if post.author != self.request.user:
-            if (not post.is_published or not post.category.is_published
-                    or post.pub_date > timezone.now()):
-                raise Http404
-            return post
-        return post
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user).select_related(
+            'author', 'category', 'location', 'image_meta'
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author').order_by('created')
-        )
+        context['comments'] = get_comments_page(self.object)
         return context
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
+@anonymous_page_cache(post_namespace, until_next_publication=False)
+def post_comments(request, post_id):
+    post = get_object_or_404(
+        Post.objects.visible_to(request.user), pk=post_id
+    )
+    comments = get_comments_page(post, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+    context = {
+        'post': post,
+        'comments': comments,
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+class PostUpdateView(PostImageUploadMixin, LoginRequiredMixin, UpdateView):
     model = Post
     template_name = 'blog/create.html'
     form_class = PostForm
@@ -172,7 +242,9 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     form_class = CommentForm
 
     def dispatch(self, request, *args, **kwargs):
-        self.target_post = get_object_or_404(Post, pk=kwargs['post_id'])
+        self.target_post = get_object_or_404(
+            Post.objects.visible_to(request.user), pk=kwargs['post_id']
+        )
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
@@ -238,10 +310,11 @@ class CommentDeleteView(DeleteView, LoginRequiredMixin):
         )
 
 
-class CategoryListView(ListView):
+@method_decorator(replica_reads, name='dispatch')
+@method_decorator(anonymous_page_cache(FEEDS_NAMESPACE), name='dispatch')
+class CategoryListView(FeedPaginationMixin, ListView):
     model = Post
     template_name = 'blog/category.html'
-    paginate_by = settings.POSTS_PER_PAGE
 
     def get_queryset(self):
         category_slug = self.kwargs['category_slug']
@@ -250,10 +323,10 @@ class CategoryListView(ListView):
             slug=category_slug,
             is_published=True,
         )
-        return self.category.posts.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-        ).order_by('-pub_date')
+        return self.category.posts.published().for_feed()
+
+    def get_count_cache_key(self):
+        return f'category:{self.category.pk}'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -0,0 +1,57 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE_RE = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def apply_pragmas(connection, pragmas):
+    """Выполняет PRAGMA из словаря {имя: значение} на соединении sqlite3.
+
+    PRAGMA не принимает параметры запроса, поэтому имена и значения
+    проверяются: допускаются только идентификаторы и целые числа.
+    """
+    for name, value in pragmas.items():
+        value = str(value)
+        if not PRAGMA_NAME_RE.match(name) or not PRAGMA_VALUE_RE.match(value):
+            raise ImproperlyConfigured(
+                f'Недопустимая настройка SQLite: PRAGMA {name} = {value}'
+            )
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с профилем PRAGMA для каждого нового соединения.
+
+    Профиль задаётся в OPTIONS['pragmas'], режим начала транзакций для
+    transaction.atomic() — в OPTIONS['transaction_mode']. С IMMEDIATE
+    пишущая транзакция сразу берёт блокировку на запись и ждёт её
+    busy_timeout, а не падает с «database is locked», когда читающая
+    транзакция пытается стать пишущей.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(
+            connection, self.settings_dict['OPTIONS'].get('pragmas', {})
+        )
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get(
+            'transaction_mode', 'DEFERRED'
+        ).upper()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Недопустимый режим транзакций SQLite: {mode}'
+            )
+        self.cursor().execute(f'BEGIN {mode}')
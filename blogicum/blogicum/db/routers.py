@@ -0,0 +1,102 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'primary_until'
+
+_request_state = ContextVar('db_request_state', default=None)
+
+
+def replica_reads(view_func):
+    """Разрешает представлению читать из реплики.
+
+    Флаг действует до конца запроса, чтобы и ленивые запросы при
+    отрисовке шаблона ушли в реплику. Без ReplicaPinMiddleware или
+    с DATABASE_REPLICA = None всё по-прежнему читается из default.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        state = _request_state.get()
+        if state is not None and request.method in ('GET', 'HEAD'):
+            state['replica'] = True
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def reads_from_replica():
+    """Идут ли чтения текущего запроса в реплику."""
+    state = _request_state.get()
+    return bool(
+        settings.DATABASE_REPLICA and state is not None
+        and state['replica'] and not state['pinned'] and not state['wrote']
+    )
+
+
+class ReplicaRouter:
+    """Направляет чтения представлений с replica_reads в реплику.
+
+    Запись и все остальные чтения идут в default. Если запрос уже
+    что-то записал или пользователь закреплён за основной базой
+    после недавней записи, реплика не используется.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            return settings.DATABASE_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # В реплике те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает в реплику вместе с данными при репликации.
+        return db != settings.DATABASE_REPLICA
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за основной базой после записи.
+
+    Реплика отстаёт, поэтому после запроса, который что-то записал,
+    ставится cookie: REPLICA_PIN_SECONDS все чтения этого браузера идут
+    в default, и автор сразу видит свой пост или комментарий.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {
+            'replica': False,
+            'pinned': self.is_pinned(request),
+            'wrote': False,
+        }
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state['wrote']:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + seconds), max_age=seconds,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
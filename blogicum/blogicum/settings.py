@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blogicum.staticfiles.StaticFilesMiddleware',
+    'blogicum.db.routers.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -81,13 +83,66 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Профиль SQLite для нескольких процессов gunicorn: WAL не даёт
+# писателю блокировать читателей, synchronous=NORMAL в WAL безопасен
+# и не делает fsync на каждый коммит, busy_timeout ждёт блокировку
+# вместо ошибки «database is locked». См. blogicum/db/base.py.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер кеша страниц в КиБ.
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blogicum.db',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Алиас реплики в DATABASES, из которой читают ленты и страницы постов
+# (представления с replica_reads). None — всё читается из default.
+DATABASE_REPLICA = None
+
+# Сколько секунд после записи браузер читает только из default. Должно
+# быть больше обычного отставания реплики.
+REPLICA_PIN_SECONDS = 10
+
+DATABASE_ROUTERS = ['blogicum.db.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Кеш страниц сбрасывается счётчиками версий в кеше. LocMemCache свой в
+# каждом процессе: увеличение версии в одном процессе gunicorn не видно
+# остальным. Для нескольких процессов нужен общий бэкенд, например
+# PyMemcacheCache или DatabaseCache; с LocMemCache `manage.py check`
+# выдаёт предупреждение blog.W001, а страницы живут не дольше
+# LOCAL_PAGE_CACHE_TIMEOUT.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Время жизни страниц лент и постов, закешированных для анонимных
+# пользователей; для лент оно ещё ограничено ближайшей отложенной
+# публикацией.
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Предел времени жизни для кеша, локального для процесса: столько другие
+# процессы могут отдавать устаревшую страницу.
+LOCAL_PAGE_CACHE_TIMEOUT = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -129,6 +184,17 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / STATIC_URL
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# В DEBUG статика отдаётся как есть. В бою collectstatic добавляет хеш
+# в имена и кладёт рядом .gz/.br-копии, а StaticFilesMiddleware отдаёт их
+# с вечным кешированием.
+if not DEBUG:
+    STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+
+STATIC_CACHE_MAX_AGE = 60 * 60
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -137,10 +203,55 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 POSTS_PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 50
+
+# Режим постраничного вывода лент: 'page' — номера страниц (?page=),
+# 'cursor' — курсоры по (pub_date, id) без COUNT(*) и OFFSET (?cursor=).
+FEED_PAGINATION = 'page'
+
+# Сколько постов ленты считать точно; при большем числе счётчик
+# страниц становится оценкой и ссылка на последнюю страницу скрывается.
+FEED_COUNT_LIMIT = 10000
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Сколько секунд браузер может кешировать медиафайлы, имя которых не
+# построено из хеша содержимого (такие кешируются навсегда).
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Кто передаёт байты медиафайлов: None — сам Django,
+# 'x-accel-redirect' — nginx (нужна internal-локация
+# MEDIA_ACCEL_REDIRECT_PREFIX, смотрящая в MEDIA_ROOT),
+# 'x-sendfile' — Apache mod_xsendfile или lighttpd.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Уменьшенные копии фото постов: имя -> ширины для srcset.
+POST_IMAGE_RENDITIONS = {
+    'card': (320, 480, 640),
+    'detail': (640, 960, 1280),
+}
+
+# Современные форматы копий; те, для которых в Pillow нет кодека
+# (AVIF — только с пакетом pillow-avif-plugin), пропускаются.
+POST_IMAGE_FORMATS = ('avif', 'webp')
+
+# 'queue' — копии делает `manage.py run_image_worker` в фоне,
+# 'sync' — прямо при сохранении формы.
+POST_IMAGE_PROCESSING = 'queue'
+
+POST_IMAGE_MAX_ATTEMPTS = 3
+
+# Ограничения на загружаемое фото: размер файла в байтах и число
+# пикселей по заголовку (защита от «бомб» — маленьких файлов, которые
+# при декодировании занимают гигабайты памяти).
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -0,0 +1,153 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .views import IMMUTABLE_MAX_AGE
+
+try:
+    # Необязательная зависимость: без неё .br-копии не создаются.
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.xml', '.html',
+)
+# Кодировки в порядке предпочтения и расширения их копий.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+# Имя, которое дал файлу ManifestStaticFilesStorage: style.0123456789ab.css.
+HASHED_STATIC_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+def compress_file(path):
+    """Пишет рядом с файлом .gz и, если есть brotli, .br-копию.
+
+    Копия сохраняется, только если она заметно меньше оригинала.
+    """
+    with open(path, 'rb') as file:
+        content = file.read()
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    written = []
+    for suffix, compressed in variants:
+        if len(compressed) < len(content) * 0.95:
+            with open(path + suffix, 'wb') as file:
+                file.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest-хранилище, которое после collectstatic сжимает файлы.
+
+    Для каждого текстового файла с хешем в имени появляются
+    предварительно сжатые копии, их отдаёт `StaticFilesMiddleware`.
+    """
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get('dry_run'):
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                compress_file(self.path(name))
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        encoding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def _negotiate(path, accept_encoding):
+    """Выбирает сжатую копию файла, которую примет клиент."""
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(path + suffix):
+            return encoding, path + suffix
+    return None, path
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT без внешнего веб-сервера.
+
+    Файлы с хешем в имени кешируются браузером навсегда, остальные —
+    на STATIC_CACHE_MAX_AGE. Если клиент принимает br или gzip и рядом
+    лежит сжатая копия, отдаётся она. Запросы к файлам, которых нет
+    в STATIC_ROOT, передаются дальше (в DEBUG их отдаёт staticfiles).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = None
+        if request.method in ('GET', 'HEAD') and settings.STATIC_ROOT:
+            response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def serve(self, request):
+        prefix = '/' + settings.STATIC_URL.lstrip('/')
+        if not request.path_info.startswith(prefix):
+            return None
+        name = request.path_info[len(prefix):]
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        encoding, served_path = _negotiate(
+            path, request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        stat = os.stat(served_path)
+        etag = quote_etag(
+            f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+            + (f'-{encoding}' if encoding else '')
+        )
+        last_modified = int(stat.st_mtime)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            content_type = mimetypes.guess_type(path)[0]
+            response = FileResponse(
+                open(served_path, 'rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        if HASHED_STATIC_RE.search(name):
+            max_age = f'{IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            max_age = settings.STATIC_CACHE_MAX_AGE
+        response['Cache-Control'] = f'public, max-age={max_age}'
+        if any(os.path.isfile(path + suffix) for _, suffix in ENCODINGS):
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -13,12 +13,15 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib.auth.forms import UserCreationForm
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .views import serve_media
 
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
@@ -34,7 +37,12 @@ urlpatterns = [
         ),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+        r'^{}(?P<path>.+)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        serve_media,
+        name='media',
+    ),
+]
 
 handler403 = 'pages.views.permission_denied'
 handler404 = 'pages.views.page_not_found'
@@ -3,6 +3,7 @@ import re
 import time
 from http import HTTPStatus
 from inspect import getsource
+from io import BytesIO
 from pathlib import Path
 from typing import (
     Iterable,
@@ -19,12 +20,16 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
+from django.utils import timezone
 from mixer.backend.django import mixer as _mixer
+from PIL import Image
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
@@ -41,6 +46,53 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture
+def make_image():
+    """Фабрика загружаемых фото; PNG или JPEG — по расширению имени."""
+    def make(size=(800, 600), color=(30, 120, 200), name="photo.jpg",
+             orientation=None):
+        buffer = BytesIO()
+        image = Image.new("RGB", size, color=color)
+        if name.lower().endswith(".png"):
+            image.save(buffer, "PNG")
+            return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+        exif = Image.Exif()
+        if orientation:
+            exif[0x0112] = orientation
+        image.save(buffer, "JPEG", exif=exif)
+        return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+    return make
+
+
+@pytest.fixture
+def post_form_data(published_category):
+    """Данные формы поста с фото в опубликованной категории."""
+    def make(image, title="Пост с фото"):
+        return {
+            "title": title,
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+            "category": published_category.id,
+            "image": image,
+        }
+
+    return make
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.css import build, collect_classes
+
+CSS = (
+    '@charset "UTF-8";:root{--bs-blue:#0d6efd}body{margin:0}'
+    '.btn,.unused-a{color:red}.card .card-body{padding:1rem}'
+    '.unused-b{display:none}'
+    '.input-group:not(.has-validation)>.form-control{border:0}'
+    '@media (min-width:576px){.container{max-width:540px}'
+    '.unused-c{width:1px}}'
+    '@media print{.unused-d{display:none}}'
+    '@keyframes spin{to{transform:rotate(360deg)}}'
+    '.icon{background:url("data:image/svg+xml,%3csvg a=\'{b}\'%3e")}'
+)
+
+
+def test_collect_classes_ignores_template_tags(tmp_path):
+    template = tmp_path / "page.html"
+    template.write_text(
+        '<a class="nav-link {% if active %} text-white {% endif %}">'
+        "<div class='card {{ extra }}'>",
+        encoding="utf-8",
+    )
+    assert collect_classes([template]) == {"nav-link", "text-white", "card"}
+
+
+def test_build_keeps_only_used_rules():
+    used = {"btn", "card", "card-body", "container", "input-group",
+            "form-control", "icon"}
+    purged, critical = build(CSS, used, {"btn"})
+
+    assert "unused" not in purged, "Неиспользуемые классы нужно вырезать."
+    assert ".btn{color:red}" in purged
+    assert ".card .card-body{padding:1rem}" in purged
+    assert ".input-group:not(.has-validation)>.form-control" in purged, (
+        "Класс внутри :not() не должен требоваться для селектора."
+    )
+    assert "@media (min-width:576px){.container{max-width:540px}}" in purged
+    assert "@media print" not in purged, "Пустые @media нужно удалять."
+    assert "@keyframes spin" in purged
+    assert "%3csvg a='{b}'%3e" in purged
+
+    assert ":root{--bs-blue:#0d6efd}body{margin:0}" in critical
+    assert ".btn{color:red}" in critical
+    assert ".card" not in critical
+    assert "@keyframes" not in critical
+
+
+def test_built_styles_are_up_to_date():
+    out = StringIO()
+    call_command("build_css", "--check", stdout=out)
+    assert "КБ" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_base_inlines_critical_css(client):
+    content = client.get("/").content.decode()
+    assert "<style>:root{" in content, (
+        "Критический CSS должен быть встроен в страницу."
+    )
+    assert 'rel="preload"' in content and "site.min.css" in content
+    assert "cdn.jsdelivr.net" not in content
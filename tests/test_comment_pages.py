@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+COMMENTS_PER_PAGE = 4
+
+
+@pytest.fixture
+def post_with_comments(
+        mixer: Mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    comments = [
+        mixer.blend("blog.Comment", post=post, text=f"Комментарий №{i}")
+        for i in range(COMMENTS_PER_PAGE * 2 + 1)
+    ]
+    return post, comments
+
+
+@override_settings(COMMENTS_PER_PAGE=COMMENTS_PER_PAGE)
+def test_detail_page_renders_first_comments_page(client, post_with_comments):
+    post, comments = post_with_comments
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f"/posts/{post.id}/")
+    assert len(ctx) <= 2
+    page = response.context["comments"]
+    assert [c.id for c in page] == [c.id for c in comments[:4]]
+    assert page.has_next()
+    assert f"/posts/{post.id}/comments/?cursor=" in response.content.decode()
+
+
+@override_settings(COMMENTS_PER_PAGE=COMMENTS_PER_PAGE)
+def test_comments_endpoint_walks_all_pages(client, post_with_comments):
+    post, comments = post_with_comments
+    seen = []
+    cursor = ""
+    while True:
+        data = client.get(
+            f"/posts/{post.id}/comments/",
+            {"format": "json", "cursor": cursor},
+        ).json()
+        seen.extend(item["id"] for item in data["comments"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [c.id for c in comments]
+
+
+@override_settings(COMMENTS_PER_PAGE=COMMENTS_PER_PAGE)
+def test_comments_endpoint_renders_fragment(client, post_with_comments):
+    post, comments = post_with_comments
+    first_page = client.get(f"/posts/{post.id}/")
+    cursor = first_page.context["comments"].next_cursor
+    response = client.get(f"/posts/{post.id}/comments/?cursor={cursor}")
+    content = response.content.decode()
+    assert "<html" not in content
+    assert comments[COMMENTS_PER_PAGE].text in content
+    assert comments[0].text not in content
+
+
+def test_comments_of_hidden_post_are_not_served(client, post_with_comments):
+    post, _ = post_with_comments
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def test_comments_count_follows_views(
+        user_client, post, CommentModel, PostModel
+):
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+    post.refresh_from_db()
+    assert post.comments_count == 2
+
+    comment = CommentModel.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comments_count == 1
+
+
+def test_comments_count_follows_cascade_delete(
+        mixer: Mixer, post, another_user
+):
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comments_count == 1
+
+
+def test_recount_comments_repairs_counts(mixer: Mixer, post, PostModel):
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    PostModel.objects.filter(pk=post.pk).update(comments_count=42)
+    call_command("recount_comments", batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comments_count == 3
+
+
+def test_feed_does_not_read_comments(mixer: Mixer, client, post):
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    with CaptureQueriesContext(connection) as ctx:
+        content = client.get("/").content.decode()
+    assert "Комментарии (2)" in content
+    assert not any("blog_comment" in q["sql"] for q in ctx.captured_queries)
+
+
+def test_loaddata_keeps_comments_count(
+        mixer: Mixer, post, another_user, PostModel, tmp_path, monkeypatch
+):
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    PostModel.objects.filter(pk=post.pk).update(
+        image="post_images/missing.jpg"
+    )
+    path = tmp_path / "dump.json"
+    call_command("dumpdata", "auth.user", "blog", output=str(path))
+    get_user_model().objects.all().delete()
+    assert not PostModel.objects.exists()
+
+    storage = PostModel._meta.get_field("image").storage
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Загрузка фикстуры не должна открывать файлы.")
+
+    monkeypatch.setattr(storage, "open", fail)
+    call_command("loaddata", str(path), stdout=StringIO())
+    assert PostModel.objects.get(pk=post.pk).comments_count == 3, (
+        "loaddata не должна повторно увеличивать счётчик комментариев."
+    )
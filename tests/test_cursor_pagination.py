@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category, published_location):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют сортировку по id.
+    dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=dates,
+    )
+
+
+def _get_page(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.context["page_obj"], ctx.captured_queries
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pages_cover_feed(user_client, feed_posts):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    seen, cursors, query_counts = [], [], []
+    page, queries = _get_page(user_client, "/")
+    assert not page.has_previous()
+    while True:
+        seen.extend(post.id for post in page)
+        query_counts.append(len(queries))
+        assert not any(
+            "COUNT(" in q["sql"] and "blog_post" in q["sql"]
+            and "blog_comment" not in q["sql"]
+            for q in queries
+        ), "Курсорная пагинация не должна считать все посты ленты."
+        if not page.has_next():
+            break
+        cursors.append(page.next_cursor)
+        page, queries = _get_page(user_client, f"/?cursor={page.next_cursor}")
+
+    assert seen == expected
+    assert len(set(query_counts)) == 1, (
+        "Убедитесь, что любая страница ленты выбирается тем же числом"
+        " запросов, что и первая."
+    )
+
+    back_ids = []
+    while page.has_previous():
+        page, _ = _get_page(user_client, f"/?cursor={page.previous_cursor}")
+        back_ids = [post.id for post in page] + back_ids
+    assert back_ids == expected[:len(back_ids)]
+    assert back_ids and back_ids[0] == expected[0]
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_invalid_cursor_falls_back_to_first_page(user_client, feed_posts):
+    page, _ = _get_page(user_client, "/?cursor=not-a-cursor")
+    first_page, _ = _get_page(user_client, "/")
+    assert [p.id for p in page] == [p.id for p in first_page]
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_links(user_client, feed_posts):
+    content = user_client.get("/").content.decode("utf-8")
+    assert "?cursor=" in content
+    assert "?page=" not in content
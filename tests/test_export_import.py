@@ -0,0 +1,102 @@
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_data(mixer, user):
+    post = mixer.blend(
+        "blog.Post", author=user, location=mixer.blend("blog.Location")
+    )
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+def _export(path, *args):
+    out = StringIO()
+    call_command("export_blog", str(path), *args, stdout=out)
+    return out.getvalue()
+
+
+def _read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_export_streams_dumpdata_records(tmp_path, blog_data):
+    path = tmp_path / "blog.jsonl.gz"
+    output = _export(path, "--chunk-size", "1")
+    records = _read_lines(path)
+    assert [record["model"] for record in records] == [
+        "blog.category", "blog.location", "blog.post",
+        "blog.comment", "blog.comment", "blog.comment",
+    ], "Связанные записи должны идти раньше ссылающихся."
+    assert records[2]["fields"]["title"] == blog_data.title
+    assert "blog.Comment: 3" in output
+
+
+def test_export_since_filters_by_creation(tmp_path, blog_data):
+    old = timezone.now() - timedelta(days=30)
+    Comment.objects.filter(pk=blog_data.comments.first().pk).update(
+        created=old
+    )
+    path = tmp_path / "blog.jsonl.gz"
+    _export(path, "--since", (old + timedelta(days=1)).date().isoformat())
+    models = [record["model"] for record in _read_lines(path)]
+    assert models.count("blog.comment") == 2
+
+
+def test_import_restores_export(tmp_path, blog_data):
+    path = tmp_path / "blog.jsonl.gz"
+    _export(path)
+    created_at = blog_data.created_at
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+
+    out = StringIO()
+    call_command("import_blog", str(path), stdout=out)
+    post = Post.objects.get()
+    assert post.title == blog_data.title
+    assert post.created_at == created_at
+    assert post.comments_count == 3
+    assert Comment.objects.count() == 3
+    assert "записей/с" in out.getvalue()
+
+
+def test_import_updates_existing_rows(tmp_path, blog_data, mixer, user):
+    path = tmp_path / "blog.jsonl.gz"
+    since = timezone.now().isoformat()
+    _export(path)
+    Post.objects.filter(pk=blog_data.pk).update(title="Изменено")
+    call_command("import_blog", str(path), stdout=StringIO())
+    assert Post.objects.get().title == blog_data.title, (
+        "Записи с теми же ключами должны обновляться."
+    )
+
+    mixer.blend("blog.Comment", post=blog_data, author=user)
+    _export(path, "--since", since)
+    Comment.objects.order_by("-pk").first().delete()
+    call_command("import_blog", str(path), stdout=StringIO())
+    assert Comment.objects.count() == 4
+    assert Post.objects.get().comments_count == 4
+
+
+def test_import_rejects_foreign_models(tmp_path):
+    path = tmp_path / "users.jsonl"
+    path.write_text(
+        json.dumps({"model": "auth.user", "pk": 1, "fields": {}}) + "\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(CommandError):
+        call_command("import_blog", str(path), stdout=StringIO())
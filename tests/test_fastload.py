@@ -0,0 +1,96 @@
+import gzip
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.dumps import iter_json_array
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+EXCLUDE = ["-e", "auth.permission", "-e", "admin", "-e", "sessions"]
+
+RECORDS = [
+    {"model": "blog.comment", "pk": 1, "fields": {
+        "post": 1, "author": 1, "text": "Комментарий",
+        "created": "2023-01-02T10:00:00Z",
+    }},
+    {"model": "blog.post", "pk": 1, "fields": {
+        "title": "Пост", "text": "Текст", "author": 1, "category": 1,
+        "location": None, "is_published": True,
+        "pub_date": "2023-01-01T10:00:00Z",
+        "created_at": "2023-01-01T09:00:00Z",
+        "updated_at": "2023-01-01T09:30:00Z",
+        "comments_count": 1,
+    }},
+    {"model": "auth.user", "pk": 1, "fields": {
+        "username": "author", "password": "", "groups": [],
+        "user_permissions": [],
+    }},
+    {"model": "blog.category", "pk": 1, "fields": {
+        "title": "Категория", "description": "", "slug": "cat",
+        "is_published": True, "created_at": "2023-01-01T00:00:00Z",
+    }},
+]
+
+
+def test_iter_json_array_streams_small_chunks():
+    data = json.dumps(RECORDS, ensure_ascii=False, indent=2)
+    items = list(iter_json_array(io.StringIO(data), chunk_size=7))
+    assert items == RECORDS
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(data[:-10]), chunk_size=7))
+
+
+def test_fastload_loads_project_dump(settings):
+    out = StringIO()
+    call_command(
+        "fastload", str(settings.BASE_DIR / "db.json"), *EXCLUDE,
+        "--batch-size", "5", stdout=out,
+    )
+    assert Post.objects.count() == 39
+    assert Location.objects.count() == 12
+    assert Category.objects.count() == 6
+    assert get_user_model().objects.count() == 4
+    post = Post.objects.get(pk=1)
+    assert post.created_at.isoformat().startswith("2022-12-18T23:06:18"), (
+        "Даты auto_now_add должны браться из дампа."
+    )
+    assert "записей/с" in out.getvalue()
+
+
+def test_fastload_reads_unordered_json_lines(tmp_path):
+    path = tmp_path / "dump.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as stream:
+        for record in RECORDS:
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    call_command("fastload", str(path), stdout=StringIO())
+    comment = Comment.objects.select_related("post__author").get()
+    assert comment.post.author.username == "author"
+    assert comment.post.updated_at.isoformat().startswith("2023-01-01T09:30")
+
+
+def test_fastload_is_atomic(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(RECORDS[:2]), encoding="utf-8")
+    with pytest.raises(CommandError):
+        call_command("fastload", str(path), stdout=StringIO())
+    assert not Post.objects.exists(), (
+        "Записи с битыми ссылками не должны оставаться в базе."
+    )
+
+
+def test_fastload_ignore_conflicts(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    call_command("fastload", str(path), stdout=StringIO())
+    with pytest.raises(CommandError):
+        call_command("fastload", str(path), stdout=StringIO())
+    call_command("fastload", str(path), "--ignore-conflicts", stdout=StringIO())
+    assert Post.objects.count() == 1
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+@pytest.fixture
+def make_posts(mixer: Mixer, user, published_category, published_location):
+    def make(n):
+        return mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+    return make
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]
+    ]
+
+
+def test_feed_count_is_cached_until_post_write(user_client, make_posts):
+    make_posts(N_PER_PAGE + 1)
+    response, counts = _count_queries(user_client, "/")
+    assert counts
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE + 1
+
+    response, counts = _count_queries(user_client, "/?page=2")
+    assert not counts, (
+        "Убедитесь, что число постов ленты берётся из кеша."
+    )
+
+    make_posts(1)
+    response, counts = _count_queries(user_client, "/")
+    assert counts
+    assert response.context["page_obj"].paginator.count == N_PER_PAGE + 2
+
+
+@override_settings(FEED_COUNT_LIMIT=N_PER_PAGE)
+def test_large_feed_uses_estimated_count(user_client, make_posts):
+    make_posts(N_PER_PAGE * 2 + 5)
+    response = user_client.get("/")
+    page_obj = response.context["page_obj"]
+    assert page_obj.paginator.is_estimate
+    assert page_obj.has_next()
+    assert "Последняя" not in response.content.decode()
+
+    page_obj = user_client.get("/?page=3").context["page_obj"]
+    assert len(page_obj) == 5
+    assert not page_obj.has_next()
+    assert list(page_obj.page_links) == [1, 2, 3]
+
+
+@override_settings(FEED_COUNT_LIMIT=N_PER_PAGE)
+def test_estimated_feed_out_of_range_page(user_client, user, make_posts):
+    make_posts(N_PER_PAGE * 2 + 5)
+    response = user_client.get(f"/profile/{user.username}/?page=50")
+    assert response.status_code == 200, (
+        "Номер страницы за концом ленты не должен приводить к ошибке."
+    )
+    page_obj = response.context["page_obj"]
+    assert page_obj.number == 3
+    assert len(page_obj) == 5
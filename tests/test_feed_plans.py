@@ -0,0 +1,11 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_feed_queries_use_indexes():
+    out = StringIO()
+    call_command("check_feed_plans", stdout=out)
+    assert "SEARCH blog_post" in out.getvalue()
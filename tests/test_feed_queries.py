@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_feed_queries(client, url) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx)
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    ["/", "/category/{category_slug}/", "/profile/{username}/"],
+    ids=["index", "category", "profile"],
+)
+def test_feed_query_count_is_constant(
+        mixer: Mixer, user, another_user, user_client, published_category,
+        published_location, url_template,
+):
+    url = url_template.format(
+        category_slug=published_category.slug, username=user.username
+    )
+
+    def add_posts(n):
+        posts = mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+        )
+        for post in posts:
+            mixer.cycle(2).blend(
+                "blog.Comment", post=post, author=another_user
+            )
+
+    add_posts(1)
+    few_posts_queries = _count_feed_queries(user_client, url)
+    add_posts(N_PER_PAGE)
+    full_page_queries = _count_feed_queries(user_client, url)
+
+    assert few_posts_queries == full_page_queries, (
+        f"Убедитесь, что число запросов к БД на странице `{url}` не зависит"
+        " от количества постов на ней: получено"
+        f" {few_posts_queries} и {full_page_queries} запросов."
+    )
@@ -0,0 +1,114 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.media_gc import BloomFilter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def sync_processing(settings, media_root):
+    settings.POST_IMAGE_PROCESSING = "sync"
+
+
+def _orphan(media_root, name, age=2 * 60 * 60):
+    path = media_root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"orphan")
+    old = time.time() - age
+    os.utime(path, (old, old))
+    return path
+
+
+@pytest.fixture
+def post_with_image(mixer, user, published_category, make_image):
+    from blog.images import update_renditions
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, image=make_image(color="red"),
+    )
+    update_renditions(post)
+    post.refresh_from_db()
+    return post
+
+
+def _referenced_paths(post, media_root):
+    names = [post.image.name] + [
+        variant["name"]
+        for data in post.image_renditions.values()
+        for variant in data["variants"]
+    ]
+    return [media_root / name for name in names]
+
+
+def test_gc_media_removes_only_orphans(post_with_image, media_root):
+    orphan = _orphan(media_root, "post_images/ab/cd/old.jpg")
+    fresh = _orphan(media_root, "post_images/fresh.jpg", age=0)
+    referenced = _referenced_paths(post_with_image, media_root)
+    assert len(referenced) > 1
+
+    call_command("gc_media", "--dry-run", stdout=StringIO())
+    assert orphan.exists(), "В режиме --dry-run файлы удаляться не должны."
+
+    out = StringIO()
+    call_command("gc_media", "--batch-size", "1", stdout=out)
+    assert not orphan.exists()
+    assert fresh.exists(), "Свежие файлы не должны удаляться."
+    for path in referenced:
+        assert path.exists(), f"Файл {path} используется постом."
+    assert "Удалено файлов: 1" in out.getvalue()
+
+
+def test_gc_media_quarantine(post_with_image, media_root, tmp_path):
+    orphan = _orphan(media_root, "post_images/ab/cd/old.jpg")
+    quarantine = tmp_path / "quarantine"
+
+    call_command("gc_media", "--quarantine", str(quarantine), stdout=StringIO())
+    assert not orphan.exists()
+    assert (quarantine / "post_images/ab/cd/old.jpg").exists(), (
+        "Файл должен переноситься в карантин с сохранением пути."
+    )
+
+
+def test_gc_media_bloom_filter_keeps_referenced(post_with_image, media_root):
+    orphan = _orphan(media_root, "post_images/ab/cd/old.jpg")
+
+    call_command("gc_media", "--max-set-size", "0", stdout=StringIO())
+    assert not orphan.exists()
+    for path in _referenced_paths(post_with_image, media_root):
+        assert path.exists(), f"Файл {path} используется постом."
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    names = [f"post_images/{i}.jpg" for i in range(1000)]
+    for name in names:
+        bloom.add(name)
+    assert all(name in bloom for name in names)
+    misses = sum(f"other/{i}.jpg" in bloom for i in range(1000))
+    assert misses < 50
+
+
+def test_gc_media_keeps_file_reused_during_scan(media_root, make_image):
+    from blog.media_gc import remove_files
+    from blog.storage import ContentAddressedStorage
+
+    storage = ContentAddressedStorage(location=media_root)
+    name = storage.save("post_images/photo.jpg", make_image(color="blue"))
+    path = media_root / name
+    old = time.time() - 2 * 60 * 60
+    os.utime(path, (old, old))
+
+    # Файл попал в кандидаты, а затем новая загрузка переиспользовала его.
+    assert storage.save(
+        "post_images/again.jpg", make_image(color="blue")
+    ) == name
+    assert remove_files(str(media_root), [name], min_age=60 * 60) == []
+    assert path.exists(), (
+        "Файл, переиспользованный хранилищем, не должен удаляться."
+    )
@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import ImageMeta
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("media_root"),
+]
+
+
+def _is_close(placeholder, color=(30, 120, 200)):
+    # JPEG сжимает с потерями: цвет может сдвинуться на пару единиц.
+    channels = [int(placeholder[i:i + 2], 16) for i in (1, 3, 5)]
+    return all(abs(a - b) <= 4 for a, b in zip(channels, color))
+
+
+def test_meta_is_stored_on_upload(
+        user_client, make_image, post_form_data, PostModel,
+):
+    upload = make_image()
+    user_client.post("/posts/create/", post_form_data(upload))
+    post = PostModel.objects.get()
+    meta = post.image_meta
+    assert (meta.width, meta.height) == (800, 600)
+    assert meta.file_size == upload.size
+    assert meta.placeholder == "", (
+        "Заглушку считает обработчик очереди, а не запрос."
+    )
+
+    call_command(
+        "run_image_worker", "--workers", "0", "--once", stdout=StringIO()
+    )
+    meta.refresh_from_db()
+    assert _is_close(meta.placeholder), meta.placeholder
+
+
+def test_meta_respects_exif_rotation(
+        user_client, make_image, post_form_data, PostModel,
+):
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(orientation=6)),
+    )
+    meta = PostModel.objects.get().image_meta
+    assert (meta.width, meta.height) == (600, 800), (
+        "Для повёрнутого по EXIF фото ширина и высота меняются местами."
+    )
+
+
+def test_meta_follows_image_changes(
+        user_client, make_image, post_form_data, PostModel,
+):
+    user_client.post("/posts/create/", post_form_data(make_image()))
+    post = PostModel.objects.get()
+
+    data = post_form_data(make_image(size=(300, 200)))
+    user_client.post(f"/posts/{post.id}/edit/", data)
+    assert ImageMeta.objects.get(post=post).width == 300
+
+    data["image-clear"] = "on"
+    data["image"] = ""
+    user_client.post(f"/posts/{post.id}/edit/", data)
+    assert not ImageMeta.objects.filter(post=post).exists()
+
+
+def test_feed_renders_meta_without_file_access(
+        client, user_client, make_image, post_form_data, PostModel,
+        monkeypatch, settings,
+):
+    settings.POST_IMAGE_PROCESSING = "sync"
+    user_client.post(
+        "/posts/create/", post_form_data(make_image((200, 100)))
+    )
+    storage = PostModel._meta.get_field("image").storage
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Лента не должна открывать файлы фото.")
+
+    monkeypatch.setattr(storage, "open", fail)
+    content = client.get("/").content.decode()
+    assert 'width="200" height="100"' in content
+    placeholder = PostModel.objects.get().image_meta.placeholder
+    assert _is_close(placeholder), placeholder
+    assert f'style="background-color: {placeholder}"' in content
+
+
+def test_backfill_fills_missing_meta(
+        user_client, make_image, post_form_data, PostModel,
+):
+    user_client.post("/posts/create/", post_form_data(make_image()))
+    post = PostModel.objects.get()
+    ImageMeta.objects.all().delete()
+
+    out = StringIO()
+    call_command("backfill_image_meta", stdout=out)
+    meta = ImageMeta.objects.get(post=post)
+    assert (meta.width, meta.height) == (800, 600)
+    assert _is_close(meta.placeholder), meta.placeholder
+    assert "обработано постов: 1" in out.getvalue()
+
+    out = StringIO()
+    call_command("backfill_image_meta", stdout=out)
+    assert "обработано постов: 0" in out.getvalue(), (
+        "Повторный запуск не должен трогать уже заполненные посты."
+    )
@@ -0,0 +1,116 @@
+import re
+
+import pytest
+from django.core.files.base import ContentFile
+from PIL import Image
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("media_root"),
+]
+
+HASHED_RE = re.compile(r"^post_images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$")
+
+
+def test_identical_uploads_share_one_file(
+        user_client, another_user_client, make_image, post_form_data,
+        PostModel, django_capture_on_commit_callbacks,
+):
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="red", name="a.jpg"), "Первый"),
+    )
+    another_user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="red", name="b.JPG"), "Второй"),
+    )
+    first = PostModel.objects.get(title="Первый")
+    second = PostModel.objects.get(title="Второй")
+    assert HASHED_RE.match(first.image.name), first.image.name
+    assert first.image.name == second.image.name
+    storage = first.image.storage
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(second.image.name), (
+        "Файл, на который ссылается другой пост, не должен удаляться."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not storage.exists(second.image.name)
+
+
+def test_replaced_image_is_released(
+        user_client, make_image, post_form_data, PostModel,
+        django_capture_on_commit_callbacks,
+):
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="blue"), "Пост"),
+    )
+    post = PostModel.objects.get(title="Пост")
+    old_name = post.image.name
+    storage = post.image.storage
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(
+            f"/posts/{post.id}/edit/",
+            post_form_data(make_image(color="green"), "Пост"),
+        )
+    post.refresh_from_db()
+    assert post.image.name != old_name
+    assert not storage.exists(old_name)
+    assert storage.exists(post.image.name)
+
+
+def test_client_hash_like_name_is_not_trusted(
+        user_client, make_image, post_form_data, PostModel,
+):
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="red"), "Первый"),
+    )
+    first = PostModel.objects.get(title="Первый")
+    spoofed = first.image.name.rsplit("/", 1)[1]
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="blue", name=spoofed), "Второй"),
+    )
+    second = PostModel.objects.get(title="Второй")
+    assert HASHED_RE.match(second.image.name), second.image.name
+    assert second.image.name != first.image.name, (
+        "Имя файла от клиента не должно заменять хеш содержимого."
+    )
+    with second.image.open() as file:
+        assert Image.open(file).getpixel((0, 0))[2] > 200
+
+
+def test_release_skips_file_reused_meanwhile(
+        user_client, make_image, post_form_data, PostModel,
+        django_capture_on_commit_callbacks,
+):
+    user_client.post(
+        "/posts/create/",
+        post_form_data(make_image(color="blue"), "Пост"),
+    )
+    post = PostModel.objects.get(title="Пост")
+    old_name = post.image.name
+    storage = post.image.storage
+    with storage.open(old_name) as file:
+        content = file.read()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        user_client.post(
+            f"/posts/{post.id}/edit/",
+            post_form_data(make_image(color="green"), "Пост"),
+        )
+    # Та же картинка загружается снова, но пост с ней ещё не сохранён.
+    assert storage.save("post_images/again.jpg", ContentFile(content)) == (
+        old_name
+    )
+    for callback in callbacks:
+        callback()
+    assert storage.exists(old_name), (
+        "Файл, переиспользованный после замены фото, не должен удаляться."
+    )
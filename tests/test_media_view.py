@@ -0,0 +1,98 @@
+import pytest
+
+HASHED = "post_images/ab/cd/" + "abcd" * 16 + ".jpg"
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_files(media_root):
+    for name in (HASHED, "post_images/photo.jpg"):
+        path = media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+
+
+def test_hashed_file_is_cached_forever(client):
+    response = client.get("/media/" + HASHED)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Content-Type"] == "image/jpeg"
+    assert "immutable" in response["Cache-Control"], (
+        "Файлы с именем из хеша содержимого должны кешироваться навсегда."
+    )
+    assert response["ETag"].startswith('"abcd')
+    assert response["Accept-Ranges"] == "bytes"
+
+
+def test_other_file_gets_short_cache(client, settings):
+    response = client.get("/media/post_images/photo.jpg")
+    assert response.status_code == 200
+    assert "immutable" not in response["Cache-Control"]
+    assert f"max-age={settings.MEDIA_CACHE_MAX_AGE}" in (
+        response["Cache-Control"]
+    )
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/media/" + HASHED)["ETag"]
+    response = client.get("/media/" + HASHED, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "При совпадении If-None-Match должен возвращаться ответ 304."
+    )
+    assert response["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [
+        ("bytes=0-99", 0, 99),
+        ("bytes=1000-", 1000, 1023),
+        ("bytes=-24", 1000, 1023),
+        ("bytes=1000-5000", 1000, 1023),
+    ],
+)
+def test_range_request(client, header, start, end):
+    response = client.get("/media/" + HASHED, HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes {start}-{end}/1024"
+    assert b"".join(response.streaming_content) == CONTENT[start:end + 1]
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/media/" + HASHED, HTTP_RANGE="bytes=5000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */1024"
+
+
+def test_if_range_mismatch_returns_whole_file(client):
+    response = client.get(
+        "/media/" + HASHED, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "backend, header", [
+        ("x-accel-redirect", "X-Accel-Redirect"),
+        ("x-sendfile", "X-Sendfile"),
+    ],
+)
+def test_sendfile_offload(client, settings, backend, header):
+    settings.MEDIA_SENDFILE = backend
+    response = client.get("/media/" + HASHED)
+    assert response.status_code == 200
+    assert response.content == b"", (
+        "При передаче файла прокси тело ответа должно быть пустым."
+    )
+    assert response[header].endswith(HASHED)
+
+
+@pytest.mark.parametrize(
+    "path", ["post_images/missing.jpg", "post_images", "../settings.py"]
+)
+def test_missing_files_are_404(client, path):
+    assert client.get("/media/" + path).status_code == 404
+
+
+def test_unsafe_methods_are_not_allowed(client):
+    assert client.post("/media/" + HASHED).status_code == 405
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.cache import get_next_publication_timeout, get_page_cache_timeout
+from blog.checks import check_shared_page_cache
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        title="Первый заголовок",
+    )
+
+
+def _content(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode()
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/",
+        "/category/{post.category.slug}/",
+        "/profile/{post.author.username}/",
+        "/posts/{post.id}/",
+    ],
+    ids=["index", "category", "profile", "detail"],
+)
+def test_anonymous_pages_are_cached_and_invalidated(
+        client, post, PostModel, url_template
+):
+    url = url_template.format(post=post)
+    assert "Первый заголовок" in _content(client, url)
+
+    PostModel.objects.filter(pk=post.pk).update(title="Без сигналов")
+    assert "Первый заголовок" in _content(client, url)
+
+    post.title = "Второй заголовок"
+    post.save()
+    assert "Второй заголовок" in _content(client, url)
+
+
+def test_authenticated_pages_are_not_cached(user_client, post, PostModel):
+    url = f"/posts/{post.id}/"
+    assert "Первый заголовок" in _content(user_client, url)
+    PostModel.objects.filter(pk=post.pk).update(title="Без сигналов")
+    assert "Без сигналов" in _content(user_client, url)
+
+
+def test_comment_invalidates_detail_page(mixer: Mixer, client, post):
+    url = f"/posts/{post.id}/"
+    _content(client, url)
+    comment = mixer.blend("blog.Comment", post=post, text="Новый комментарий")
+    assert comment.text in _content(client, url)
+
+
+def test_category_change_invalidates_pages(client, post):
+    _content(client, "/")
+    post.category.is_published = False
+    post.category.save()
+    assert post.title not in _content(client, "/")
+
+
+def test_timeout_is_capped_by_next_publication(mixer: Mixer, post):
+    assert get_next_publication_timeout(300) == 300
+    mixer.blend(
+        "blog.Post",
+        category=post.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < get_next_publication_timeout(300) <= 30
+
+
+def test_local_cache_shortens_page_timeout(settings):
+    settings.PAGE_CACHE_TIMEOUT = 300
+    settings.LOCAL_PAGE_CACHE_TIMEOUT = 10
+    assert get_page_cache_timeout() == 10, (
+        "Версии в LocMemCache не видны другим процессам: срок жизни "
+        "страниц нужно ограничить."
+    )
+    assert [w.id for w in check_shared_page_cache(None)] == ["blog.W001"]
+
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cache",
+    }}
+    assert get_page_cache_timeout() == 300
+    assert check_shared_page_cache(None) == []
@@ -0,0 +1,89 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+@pytest.fixture
+def cached_post(mixer: Mixer, user, user_client, published_category,
+                published_location):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        title="Исходный заголовок",
+    )
+    assert "Исходный заголовок" in user_client.get("/").content.decode()
+    return post
+
+
+def test_post_card_is_served_from_cache(user_client, cached_post, PostModel):
+    # update() не меняет updated_at, значит карточка берётся из кеша.
+    PostModel.objects.filter(pk=cached_post.pk).update(title="Без сигналов")
+    assert "Исходный заголовок" in user_client.get("/").content.decode()
+
+
+def test_post_save_invalidates_card(user_client, cached_post):
+    cached_post.title = "Новый заголовок"
+    cached_post.save()
+    content = user_client.get("/").content.decode()
+    assert "Новый заголовок" in content
+    assert "Исходный заголовок" not in content
+
+
+def test_comment_invalidates_card(mixer: Mixer, user_client, cached_post):
+    mixer.blend("blog.Comment", post=cached_post)
+    assert "Комментарии (1)" in user_client.get("/").content.decode()
+
+
+@pytest.mark.parametrize(
+    ("related", "field", "value"),
+    [
+        ("category", "title", "Переименованная категория"),
+        ("location", "name", "Переименованное место"),
+    ],
+)
+def test_related_save_invalidates_card(
+        user_client, cached_post, related, field, value
+):
+    obj = getattr(cached_post, related)
+    setattr(obj, field, value)
+    updated_at = cached_post.updated_at
+    with CaptureQueriesContext(connection) as queries:
+        obj.save()
+    assert value in user_client.get("/").content.decode()
+    assert not [q for q in queries if "blog_post" in q["sql"]], (
+        "Правка категории или места не должна обновлять строки постов."
+    )
+    cached_post.refresh_from_db()
+    assert cached_post.updated_at == updated_at
+
+
+def test_author_rename_invalidates_card(user_client, cached_post, user):
+    user.username = "renamed_author"
+    user.save()
+    content = user_client.get("/").content.decode()
+    assert "@renamed_author" in content, (
+        "После смены имени автора карточка должна показывать новое имя."
+    )
+    assert "/profile/renamed_author/" in content
+
+
+def test_loaddata_installs_seed_fixture(PostModel):
+    fixture = Path(settings.BASE_DIR) / "db.json"
+    call_command("loaddata", str(fixture), stdout=StringIO())
+    assert PostModel.objects.exists()
+    assert not PostModel.objects.filter(updated_at__isnull=True).exists(), (
+        "Посты из фикстуры без updated_at должны получать текущее время."
+    )
@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+@pytest.fixture
+def post_with_comments(
+        mixer: Mixer, user, another_user, published_category,
+        published_location
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+    )
+    mixer.cycle(5).blend("blog.Comment", post=post, author=another_user)
+    mixer.cycle(5).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+def test_post_detail_takes_two_queries(client, post_with_comments):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f"/posts/{post_with_comments.id}/")
+    assert response.status_code == 200
+    assert len(ctx) <= 2, (
+        "Убедитесь, что страница поста загружается не более чем двумя"
+        " запросами к БД: пост со связанными объектами и комментарии с"
+        f" авторами. Выполнено запросов: {len(ctx)}."
+    )
+
+
+def test_hidden_post_is_not_fetched_for_others(
+        client, another_user_client, user_client, post_with_comments
+):
+    post_with_comments.is_published = False
+    post_with_comments.save()
+    url = f"/posts/{post_with_comments.id}/"
+    assert client.get(url).status_code == 404
+    assert another_user_client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
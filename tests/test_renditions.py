@@ -0,0 +1,182 @@
+import os
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("media_root"),
+]
+
+
+@pytest.fixture
+def create_post(user_client, post_form_data):
+    def create(image, client=user_client):
+        return client.post("/posts/create/", post_form_data(image))
+
+    return create
+
+
+def _crash_on_marked(name, storage=None):
+    from blog.images import process_image
+
+    if name.endswith("crash.jpg"):
+        # Так выглядит дочерний процесс, убитый системой.
+        os._exit(1)
+    return process_image(name, storage)
+
+
+def _run_worker(**options):
+    call_command("run_image_worker", once=True, stdout=StringIO(), **options)
+
+
+def test_post_form_creates_renditions(
+        user_client, create_post, make_image, PostModel
+):
+    create_post(make_image(size=(1600, 1200)))
+    post = PostModel.objects.get(title="Пост с фото")
+    assert post.image_renditions == {}
+    assert post.get_image_url("card") == post.image.url
+
+    _run_worker(workers=1)
+    post = PostModel.objects.get(title="Пост с фото")
+    card = post.get_image_variants("card")
+    assert {(v["width"], v["height"]) for v in card} == {
+        (320, 240), (480, 360), (640, 480)
+    }
+    assert {v["type"] for v in card} >= {"image/jpeg", "image/webp"}
+    detail_widths = {v["width"] for v in post.get_image_variants("detail")}
+    assert detail_widths == {640, 960, 1280}
+    storage = post.image.storage
+    for variant in card:
+        with storage.open(variant["name"]) as f:
+            image = Image.open(f)
+            assert image.size == (variant["width"], variant["height"])
+            assert Image.MIME[image.format] == variant["type"]
+
+    card_url = post.get_image_url("card")
+    assert card_url.endswith(".640w.jpg")
+    content = user_client.get("/").content.decode()
+    assert '<source type="image/webp"' in content
+    assert f"{card_url} 640w" in content
+    assert re.search(r'width="640" height="480"[^>]* loading="lazy"', content)
+
+
+def test_small_image_uses_original(create_post, make_image, PostModel):
+    create_post(make_image(size=(300, 200)))
+    _run_worker(workers=0)
+    post = PostModel.objects.get(title="Пост с фото")
+    assert post.image_renditions == {}
+    assert post.get_image_url("card") == post.image.url
+
+
+def test_make_renditions_backfills(
+        mixer, user, published_category, make_image
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_image(size=(2000, 1000)),
+    )
+    assert post.image_renditions == {}
+    call_command("make_renditions", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.get_image_url("card").endswith(".640w.jpg")
+
+
+def test_replaced_image_job_is_skipped(
+        user_client, create_post, make_image, post_form_data, PostModel
+):
+    create_post(make_image(size=(1600, 1200)))
+    post = PostModel.objects.get(title="Пост с фото")
+    first_image = post.image.name
+    user_client.post(
+        f"/posts/{post.id}/edit/",
+        post_form_data(make_image(size=(1000, 800), name="other.jpg")),
+    )
+    post.refresh_from_db()
+    assert post.image.name != first_image
+    assert post.image_jobs.count() == 2
+
+    _run_worker(workers=0)
+    post.refresh_from_db()
+    assert post.get_image_url("card").endswith(".640w.jpg")
+    assert (640, 512) in {
+        (v["width"], v["height"]) for v in post.get_image_variants("card")
+    }
+    assert not post.image_jobs.exclude(status="done").exists()
+
+
+def test_shared_image_shares_renditions(
+        another_user_client, create_post, make_image, PostModel, media_root,
+):
+    create_post(make_image(size=(1600, 1200), name="a.jpg"))
+    create_post(
+        make_image(size=(1600, 1200), name="b.jpg"),
+        client=another_user_client,
+    )
+    _run_worker(workers=0)
+
+    first, second = PostModel.objects.all()
+    assert first.image_renditions == second.image_renditions
+    files = [path for path in media_root.rglob("*") if path.is_file()]
+    assert len(files) == len({path.name for path in files})
+    assert not [path for path in files if "_" in path.name], (
+        "Копии общего фото не должны дублироваться с суффиксами."
+    )
+    for variant in first.get_image_variants("card"):
+        assert (media_root / variant["name"]).exists()
+
+
+def test_image_change_outside_form_resets_renditions(
+        create_post, make_image, PostModel,
+        django_capture_on_commit_callbacks,
+):
+    create_post(make_image(size=(1600, 1200)))
+    _run_worker(workers=0)
+    post = PostModel.objects.get(title="Пост с фото")
+    old_variants = post.get_image_variants("card")
+    assert old_variants
+    storage = post.image.storage
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = make_image(size=(1000, 800), name="other.jpg")
+        post.save()
+    post.refresh_from_db()
+    assert post.image_renditions == {}, (
+        "Копии старого фото должны сбрасываться при любой смене фото."
+    )
+    assert post.get_image_url("card") == post.image.url
+    for variant in old_variants:
+        assert not storage.exists(variant["name"])
+
+    _run_worker(workers=0)
+    post.refresh_from_db()
+    assert (640, 512) in {
+        (v["width"], v["height"]) for v in post.get_image_variants("card")
+    }
+
+
+def test_worker_survives_killed_process(
+        create_post, make_image, PostModel, monkeypatch, settings,
+):
+    from blog.management.commands import run_image_worker
+
+    settings.POST_IMAGE_MAX_ATTEMPTS = 2
+    monkeypatch.setattr(run_image_worker, "process_image", _crash_on_marked)
+    create_post(make_image(size=(1600, 1200)))
+    post = PostModel.objects.get(title="Пост с фото")
+    crashing = post.image_jobs.create(image="post_images/crash.jpg")
+    good = post.image_jobs.exclude(pk=crashing.pk).get()
+
+    _run_worker(workers=2)
+    good.refresh_from_db()
+    crashing.refresh_from_db()
+    assert (good.status, good.attempts) == ("done", 1), (
+        "Сломанный пул не должен отнимать попытки у других задач."
+    )
+    assert (crashing.status, crashing.attempts) == ("failed", 2)
+    post.refresh_from_db()
+    assert post.get_image_url("card").endswith(".640w.jpg")
@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+from django.db import connections
+from django.utils import timezone
+
+from blogicum.db.routers import PIN_COOKIE, ReplicaRouter
+
+
+@pytest.fixture
+def sync_replica(transactional_db, settings, tmp_path):
+    """Реплика — отдельный файл SQLite, который догоняет основную базу
+    только по вызову возвращаемой функции, как отстающая репликация.
+    """
+    path = tmp_path / "replica.sqlite3"
+
+    def sync():
+        connections["default"].ensure_connection()
+        target = sqlite3.connect(path)
+        connections["default"].connection.backup(target)
+        target.close()
+
+    sync()
+    connections.settings["replica"] = dict(
+        connections.settings["default"], NAME=str(path), TEST={}
+    )
+    settings.DATABASE_REPLICA = "replica"
+    yield sync
+    connections["replica"].close()
+    del connections["replica"]
+    del connections.settings["replica"]
+
+
+def _create_post(PostModel, author, category, title="Свежий пост"):
+    return PostModel.objects.create(
+        title=title, text="Текст", author=author, category=category,
+        pub_date=timezone.now(), is_published=True,
+    )
+
+
+def test_router_reads_primary_outside_requests(settings):
+    settings.DATABASE_REPLICA = "replica"
+    router = ReplicaRouter()
+    assert router.db_for_read(None) is None
+    assert router.db_for_write(None) == "default"
+    assert not router.allow_migrate("replica", "blog")
+
+
+def test_feeds_read_from_replica(
+        sync_replica, user, another_user_client, published_category,
+        PostModel,
+):
+    sync_replica()
+    post = _create_post(PostModel, user, published_category)
+    for url in (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        assert post.title not in another_user_client.get(url).content.decode(
+        ), f"Страница {url} должна читаться из реплики."
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == 404
+
+    sync_replica()
+    assert post.title in another_user_client.get("/").content.decode()
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == 200
+
+
+def test_stale_replica_pages_are_not_cached(
+        sync_replica, user, client, published_category, PostModel,
+):
+    sync_replica()
+    post = _create_post(PostModel, user, published_category)
+    assert post.title not in client.get("/").content.decode()
+    sync_replica()
+    assert post.title in client.get("/").content.decode(), (
+        "Страница, собранная по отстающей реплике сразу после изменения, "
+        "не должна оставаться в кеше."
+    )
+
+
+def test_other_views_read_primary(
+        sync_replica, user, user_client, published_category, PostModel,
+):
+    sync_replica()
+    post = _create_post(PostModel, user, published_category)
+    response = user_client.get(f"/posts/{post.id}/edit/")
+    assert response.status_code == 200, (
+        "Страницы, не помеченные replica_reads, читают из default."
+    )
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_writer_reads_own_writes(
+        sync_replica, user_client, another_user_client, published_category,
+        PostModel,
+):
+    sync_replica()
+    response = user_client.post("/posts/create/", {
+        "title": "Мой новый пост",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": published_category.id,
+    })
+    assert response.status_code == 302
+    assert PIN_COOKIE in response.cookies, (
+        "После записи пользователь закрепляется за основной базой."
+    )
+    post = PostModel.objects.get()
+    assert post.title in user_client.get("/").content.decode()
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert post.title not in another_user_client.get("/").content.decode()
+
+    user_client.cookies[PIN_COOKIE] = "0"
+    assert post.title not in user_client.get("/").content.decode(), (
+        "После окна закрепления чтения снова идут в реплику."
+    )
@@ -0,0 +1,95 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comment, ImageMeta, Location, Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("media_root"),
+]
+
+ARGS = ["--users", "50", "--posts", "400", "--comments", "2000"]
+
+
+def _seed(*args):
+    out = StringIO()
+    call_command("seed_scale", *ARGS, *args, stdout=out)
+    return out.getvalue()
+
+
+def _snapshot():
+    first = Post.objects.order_by("pk").first()
+    return [
+        (post.title, post.pub_date, post.is_published, post.comments_count,
+         post.author_id - first.author_id)
+        for post in Post.objects.order_by("pk")
+    ]
+
+
+def test_seed_scale_creates_requested_rows():
+    output = _seed("--seed", "1")
+    assert get_user_model().objects.count() == 50
+    assert Post.objects.count() == 400
+    assert Comment.objects.count() == 2000
+    assert Category.objects.count() == 10
+    assert Location.objects.count() == 50
+    assert "записей/с" in output
+
+
+def test_seed_scale_distributions():
+    _seed("--future-fraction", "0.1", "--unpublished-fraction", "0.1")
+    now = timezone.now()
+    assert Post.objects.filter(pub_date__gt=now).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    assert not Comment.objects.filter(
+        post__pub_date__gt=now
+    ).exists(), "Отложенные посты не должны иметь комментариев."
+    assert not Post.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comments_count=F("actual")).exists()
+    assert not Comment.objects.filter(
+        created__lt=F("post__pub_date")
+    ).exists(), "Комментарий не может быть старше поста."
+    assert not Comment.objects.filter(created__gt=now).exists()
+    assert Comment.objects.values("created").distinct().count() > 1000, (
+        "Даты комментариев должны быть разнесены во времени."
+    )
+
+    per_author = sorted(
+        Counter(Post.objects.values_list("author_id", flat=True)).values(),
+        reverse=True,
+    )
+    assert sum(per_author[:10]) > 400 * 0.4, (
+        "Пятая часть авторов должна писать заметную долю постов."
+    )
+
+
+def test_seed_scale_is_deterministic():
+    _seed("--seed", "7")
+    first = _snapshot()
+    Post.objects.all().delete()
+    get_user_model().objects.all().delete()
+    _seed("--seed", "7")
+    second = _snapshot()
+    assert [row[0] for row in first] == [row[0] for row in second]
+    assert [row[2:] for row in first] == [row[2:] for row in second]
+    assert [row[1] - first[0][1] for row in first] == [
+        row[1] - second[0][1] for row in second
+    ]
+
+
+def test_seed_scale_images(client, media_root):
+    _seed("--images", "0.5", "--image-pool", "3")
+    with_images = Post.objects.exclude(image="")
+    assert with_images.exists()
+    assert ImageMeta.objects.count() == with_images.count()
+    names = set(with_images.values_list("image", flat=True))
+    assert len(names) <= 3
+    assert all((media_root / name).exists() for name in names)
+    assert client.get("/").status_code == 200
@@ -0,0 +1,64 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.db.base import apply_pragmas
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "pragma, expected",
+    [
+        ("synchronous", 1),
+        ("busy_timeout", 5000),
+        ("cache_size", -20000),
+        ("temp_store", 2),
+    ],
+)
+def test_connection_uses_pragma_profile(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {pragma}")
+        assert cursor.fetchone()[0] == expected, (
+            f"PRAGMA {pragma} должна браться из SQLITE_PRAGMAS."
+        )
+
+
+def test_wal_and_mmap_on_file_database(tmp_path, settings):
+    database = sqlite3.connect(tmp_path / "db.sqlite3")
+    apply_pragmas(database, settings.SQLITE_PRAGMAS)
+    assert database.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert database.execute("PRAGMA mmap_size").fetchone()[0] > 0
+
+
+@pytest.mark.parametrize(
+    "pragmas",
+    [{"journal_mode": "wal; DROP TABLE blog_post"}, {"a b": 1}],
+)
+def test_apply_pragmas_rejects_unsafe_values(pragmas):
+    with pytest.raises(ImproperlyConfigured):
+        apply_pragmas(sqlite3.connect(":memory:"), pragmas)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atomic_starts_immediate_transaction():
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            pass
+    assert queries.captured_queries[0]["sql"] == "BEGIN IMMEDIATE", (
+        "transaction.atomic() должен сразу брать блокировку на запись."
+    )
+
+
+def test_bench_sqlite_reports_both_profiles():
+    out = StringIO()
+    call_command(
+        "bench_sqlite", "--duration", "0.2", "--readers", "1",
+        "--writers", "1", stdout=out,
+    )
+    output = out.getvalue()
+    assert "default:" in output and "tuned:" in output
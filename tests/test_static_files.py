@@ -0,0 +1,77 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+
+from blogicum import staticfiles
+
+STORAGE = "blogicum.staticfiles.CompressedManifestStaticFilesStorage"
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / "static"
+    settings.STATICFILES_STORAGE = STORAGE
+    call_command(
+        "collectstatic", interactive=False, verbosity=0,
+        ignore_patterns=["admin", "django_bootstrap5"],
+    )
+    return settings.STATIC_ROOT
+
+
+def test_collectstatic_writes_hashed_compressed_files(collected):
+    css = staticfiles_storage.url("css/bootstrap.min.css")
+    assert staticfiles.HASHED_STATIC_RE.search(css), (
+        "collectstatic должен добавлять хеш содержимого в имя файла."
+    )
+    path = collected / css.split("/static/", 1)[1]
+    gz = path.with_name(path.name + ".gz")
+    assert gz.exists(), "Рядом с CSS должна лежать .gz-копия."
+    assert gzip.decompress(gz.read_bytes()) == path.read_bytes()
+    br = path.with_name(path.name + ".br")
+    assert br.exists() == (staticfiles.brotli is not None)
+    assert not (collected / "img/logo.png.gz").exists(), (
+        "Уже сжатые форматы повторно сжимать не нужно."
+    )
+
+
+def test_middleware_serves_hashed_file_forever(client, collected):
+    url = staticfiles_storage.url("css/bootstrap.min.css")
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert "immutable" in response["Cache-Control"]
+    assert "Accept-Encoding" in response["Vary"]
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body).startswith(b"@charset")
+
+    response = client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"], HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert response.status_code == 304
+
+
+def test_middleware_respects_accept_encoding(client, collected):
+    url = staticfiles_storage.url("css/bootstrap.min.css")
+    for header in ("", "gzip;q=0", "identity"):
+        response = client.get(url, HTTP_ACCEPT_ENCODING=header)
+        assert response.status_code == 200
+        assert not response.has_header("Content-Encoding"), (
+            f"При Accept-Encoding: {header!r} файл отдаётся без сжатия."
+        )
+
+
+def test_middleware_unhashed_name_gets_short_cache(
+        client, collected, settings,
+):
+    response = client.get("/static/css/bootstrap.min.css")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == (
+        f"public, max-age={settings.STATIC_CACHE_MAX_AGE}"
+    )
+
+
+def test_middleware_passes_through_unknown_paths(client, collected):
+    assert client.get("/static/missing.css").status_code == 404
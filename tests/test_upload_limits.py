@@ -0,0 +1,97 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from PIL import Image
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("media_root"),
+]
+
+
+def test_upload_over_byte_limit_is_rejected(
+        settings, user_client, post_form_data, PostModel,
+):
+    settings.POST_IMAGE_MAX_UPLOAD_SIZE = 1024
+    noisy = BytesIO()
+    Image.effect_noise((200, 200), 100).save(noisy, "PNG")
+    image = SimpleUploadedFile("noise.png", noisy.getvalue(), "image/png")
+
+    response = user_client.post(
+        "/posts/create/", post_form_data(image)
+    )
+    assert response.status_code == 200
+    errors = response.context["form"].errors["image"]
+    assert "слишком большой" in errors[0], (
+        "Файл больше POST_IMAGE_MAX_UPLOAD_SIZE должен отклоняться."
+    )
+    assert not PostModel.objects.exists()
+
+
+def test_upload_over_pixel_limit_is_rejected(
+        settings, user_client, make_image, post_form_data, PostModel,
+):
+    settings.POST_IMAGE_MAX_PIXELS = 1_000_000
+    response = user_client.post(
+        "/posts/create/",
+        post_form_data(make_image((4000, 4000), name="photo.png")),
+    )
+    assert response.status_code == 200
+    errors = response.context["form"].errors["image"]
+    assert "разрешение" in errors[0], (
+        "Фото с числом пикселей больше POST_IMAGE_MAX_PIXELS "
+        "должно отклоняться по заголовку."
+    )
+    assert not PostModel.objects.exists()
+
+
+def test_upload_within_limits_is_saved(
+        user_client, make_image, post_form_data, PostModel,
+):
+    response = user_client.post(
+        "/posts/create/",
+        post_form_data(make_image((300, 200), name="photo.png")),
+    )
+    assert response.status_code == 302
+    post = PostModel.objects.get()
+    assert post.image.width == 300
+
+
+def test_post_forms_still_check_csrf(
+        user, make_image, post_form_data, PostModel,
+):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+
+    response = client.post(
+        "/posts/create/",
+        post_form_data(make_image((30, 20), name="photo.png")),
+    )
+    assert response.status_code == 403, (
+        "Страница создания поста должна проверять CSRF-токен."
+    )
+
+    client.get("/posts/create/")
+    data = post_form_data(make_image((30, 20), name="photo.png"))
+    data["csrfmiddlewaretoken"] = client.cookies["csrftoken"].value
+    response = client.post("/posts/create/", data)
+    assert response.status_code == 302
+    post = PostModel.objects.get()
+
+    response = client.post(
+        f"/posts/{post.id}/edit/",
+        post_form_data(make_image((30, 20), name="photo.png"), "Другой"),
+    )
+    assert response.status_code == 403, (
+        "Страница редактирования поста должна проверять CSRF-токен."
+    )
+
+    image = make_image((30, 20), name="photo.png")
+    data = post_form_data(image, "Другой")
+    data["csrfmiddlewaretoken"] = client.cookies["csrftoken"].value
+    response = client.post(f"/posts/{post.id}/edit/", data)
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.title == "Другой"